@@ -0,0 +1,125 @@
+import asyncio
+import os
+from typing import Optional
+from fastapi import APIRouter, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from schema.common_schema import ErrorResponseSchema, SuccessResponseSchema
+from core.profiler import SamplingProfiler
+from core.memory_snapshots import GROUP_BY, MemorySnapshot, MemorySnapshotStore
+from core.bootstrap import get_memory_usage
+from core.logger import Logger
+from utils.memory_utils import process_memory
+from config.constants import PROFILER_MAX_SECONDS, MEMORY_SNAPSHOTS_MAX, MEMORY_TRACEMALLOC_FRAMES
+
+admin_api_router = APIRouter()
+logger = Logger.get_logger(__name__)
+
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+# Only one profile runs at a time; overlapping samplers would skew each other
+_profile_lock = asyncio.Lock()
+
+_memory_snapshots = MemorySnapshotStore(max_snapshots=MEMORY_SNAPSHOTS_MAX, frames=MEMORY_TRACEMALLOC_FRAMES)
+
+@admin_api_router.get("/profile")
+async def profile(response: Response, seconds: float = 10, interval_ms: float = 10, format: str = "collapsed"):
+    logger.info(f"Received request to profile the process for {seconds} seconds (interval_ms: {interval_ms}, format: {format})")
+
+    if not 0 < seconds <= PROFILER_MAX_SECONDS:
+        logger.warning(f"Invalid profile duration: {seconds}")
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return ErrorResponseSchema(error=f"Seconds must be greater than 0 and at most {PROFILER_MAX_SECONDS}.")
+    if not 1 <= interval_ms <= 1000:
+        logger.warning(f"Invalid profile interval: {interval_ms}")
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return ErrorResponseSchema(error="Interval must be between 1 and 1000 milliseconds.")
+    if format not in PROFILE_FORMATS:
+        logger.warning(f"Invalid profile format: {format}")
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return ErrorResponseSchema(error=f"Format must be one of: {', '.join(PROFILE_FORMATS)}.")
+    if _profile_lock.locked():
+        logger.warning("A profile is already running.")
+        response.status_code = status.HTTP_409_CONFLICT
+        return ErrorResponseSchema(error="A profile is already running.")
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval_seconds=interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(profiler.stop)
+
+    logger.info(f"Profile completed with {profiler.sample_count} samples.")
+    if format == "speedscope":
+        return JSONResponse(profiler.to_speedscope(), status_code=status.HTTP_200_OK)
+    return PlainTextResponse(profiler.to_collapsed(), status_code=status.HTTP_200_OK)
+
+@admin_api_router.get("/memory")
+async def get_memory_report():
+    logger.info("Received request to report memory usage")
+    return {
+        "pid": os.getpid(),
+        "process": process_memory(),
+        "components": get_memory_usage(),
+        "tracemalloc": _memory_snapshots.status(),
+    }
+
+def _snapshot_report(snapshot: MemorySnapshot, compare_to: Optional[MemorySnapshot], group_by: str, limit: int) -> dict:
+    report = {"id": snapshot.id, "taken_at": snapshot.taken_at, "traced_bytes": snapshot.traced_bytes,
+              "group_by": group_by, "top": snapshot.top(group_by, limit)}
+    if compare_to is not None:
+        report["compared_to"] = compare_to.id
+        report["traced_bytes_diff"] = snapshot.traced_bytes - compare_to.traced_bytes
+        report["diff"] = snapshot.diff(compare_to, group_by, limit)
+    return report
+
+def _validate_snapshot_query(response: Response, compare_to: Optional[int], group_by: str, limit: int):
+    """Return (snapshot to compare to, None) or (None, error)."""
+    if group_by not in GROUP_BY:
+        logger.warning(f"Invalid memory snapshot grouping: {group_by}")
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return None, ErrorResponseSchema(error=f"Group by must be one of: {', '.join(GROUP_BY)}.")
+    if not 1 <= limit <= 1000:
+        logger.warning(f"Invalid memory snapshot limit: {limit}")
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return None, ErrorResponseSchema(error="Limit must be between 1 and 1000.")
+    if compare_to is None:
+        return None, None
+    older = _memory_snapshots.get(compare_to)
+    if older is None:
+        logger.warning(f"Memory snapshot to compare to not found: {compare_to}")
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return None, ErrorResponseSchema(error=f"Snapshot {compare_to} not found.")
+    return older, None
+
+@admin_api_router.post("/memory/snapshots")
+async def take_memory_snapshot(response: Response, compare_to: Optional[int] = None, group_by: str = "module",
+                               limit: int = 20):
+    logger.info(f"Received request to take a memory snapshot (compare_to: {compare_to}, group_by: {group_by})")
+    older, error = _validate_snapshot_query(response, compare_to, group_by, limit)
+    if error is not None:
+        return error
+    snapshot = await asyncio.to_thread(_memory_snapshots.take)
+    response.status_code = status.HTTP_201_CREATED
+    return _snapshot_report(snapshot, older, group_by, limit)
+
+@admin_api_router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(snapshot_id: int, response: Response, compare_to: Optional[int] = None,
+                              group_by: str = "module", limit: int = 20):
+    logger.info(f"Received request to get memory snapshot {snapshot_id} (compare_to: {compare_to}, group_by: {group_by})")
+    older, error = _validate_snapshot_query(response, compare_to, group_by, limit)
+    if error is not None:
+        return error
+    snapshot = _memory_snapshots.get(snapshot_id)
+    if snapshot is None:
+        logger.warning(f"Memory snapshot not found: {snapshot_id}")
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return ErrorResponseSchema(error=f"Snapshot {snapshot_id} not found.")
+    return _snapshot_report(snapshot, older, group_by, limit)
+
+@admin_api_router.delete("/memory/snapshots")
+async def delete_memory_snapshots():
+    logger.info("Received request to drop memory snapshots and stop tracing")
+    await asyncio.to_thread(_memory_snapshots.stop)
+    return SuccessResponseSchema(message="Memory snapshots dropped and tracing stopped.")
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Response, status
+from fastapi.responses import PlainTextResponse
+from schema.health_schema import HealthResponseSchema, ReadinessResponseSchema
+from core.bootstrap import get_readiness, get_loop_monitor
+from core.logger import Logger
+
+health_api_router = APIRouter()
+logger = Logger.get_logger(__name__)
+
+@health_api_router.get("/healthz")
+async def healthz(response: Response):
+    logger.debug("Liveness check received.")
+    response.status_code = status.HTTP_200_OK
+    return HealthResponseSchema(status="ok")
+
+@health_api_router.get("/readyz")
+async def readyz(response: Response):
+    logger.debug("Readiness check received.")
+    ready, phases = get_readiness()
+    if not ready:
+        logger.warning("Readiness check failed: core components are not warmed up.")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return ReadinessResponseSchema(status="not ready", phases=phases)
+    response.status_code = status.HTTP_200_OK
+    return ReadinessResponseSchema(status="ready", phases=phases)
+
+@health_api_router.get("/metrics")
+async def metrics():
+    logger.debug("Metrics scrape received.")
+    lines = []
+    loop_monitor = get_loop_monitor()
+    if loop_monitor is not None:
+        lines.extend(loop_monitor.to_prometheus())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
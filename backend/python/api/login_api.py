@@ -3,17 +3,20 @@ from schema.common_schema import ErrorResponseSchema
 from schema.login_schema import LoginRequestSchema, LoginResponseSchema, LogoutResponseSchema
 from utils import user_utils, uuid_utils, session_utils
 from dao.user_dao import UserDao
-from core.bootstrap import get_session_store, get_user_dao
+from core.bootstrap import get_session_store, get_user_dao, get_login_rate_limiter
+from core.rate_limiter import LoginRateLimiter
 from core.adapters.session_store.base_session_store import BaseSessionStore
 from core.logger import Logger
 from config.constants import SESSION_EXPIRY_SECONDS
+from typing import Optional
 login_api_router = APIRouter()
 logger = Logger.get_logger(__name__)
 
 @login_api_router.post("/login")
 async def login(input_data: LoginRequestSchema, request: Request, response: Response,
                 session_store: BaseSessionStore = Depends(get_session_store),
-                user_dao: UserDao = Depends(get_user_dao)):
+                user_dao: UserDao = Depends(get_user_dao),
+                login_rate_limiter: Optional[LoginRateLimiter] = Depends(get_login_rate_limiter)):
     try:
         logger.info("Login request received.")
         logger.debug(f"Login input data: {input_data}")
@@ -50,6 +53,16 @@ async def login(input_data: LoginRequestSchema, request: Request, response: Resp
             response.status_code = status.HTTP_400_BAD_REQUEST
             return ErrorResponseSchema(error="Invalid password format.")
 
+        # Rate limit attempts per username and client IP before any DB or bcrypt work
+        client_ip = request.client.host if request.client else None
+        if login_rate_limiter is not None:
+            retry_after = await login_rate_limiter.check(input_data.username, client_ip)
+            if retry_after:
+                logger.warning(f"Too many login attempts for username: {input_data.username}, client_ip: {client_ip}")
+                response.status_code = status.HTTP_429_TOO_MANY_REQUESTS
+                response.headers["Retry-After"] = str(retry_after)
+                return ErrorResponseSchema(error="Too many login attempts. Please try again later.")
+
         # Fetch user data
         logger.info(f"Fetching user data for username: {input_data.username}")
         user_data, err = await user_dao.get_user_by_username(input_data.username)
@@ -59,6 +72,7 @@ async def login(input_data: LoginRequestSchema, request: Request, response: Resp
             return ErrorResponseSchema(error="Failed to retrieve user.")
         if not user_data:
             logger.warning(f"User not found for username: {input_data.username}")
+            user_utils.verify_dummy_password(input_data.password)
             response.status_code = status.HTTP_401_UNAUTHORIZED
             return ErrorResponseSchema(error="Invalid username or password.")
 
@@ -69,8 +83,11 @@ async def login(input_data: LoginRequestSchema, request: Request, response: Resp
             response.status_code = status.HTTP_401_UNAUTHORIZED
             return ErrorResponseSchema(error="Invalid username or password.")
 
+        if login_rate_limiter is not None:
+            await login_rate_limiter.reset(input_data.username, client_ip)
+
         # Create new session
-        session_id = uuid_utils.generate_uuid()
+        session_id = uuid_utils.generate_session_id()
         session_expires_at = session_utils.get_session_expiration_timestamp(SESSION_EXPIRY_SECONDS)
         logger.info(f"Creating new session for username: {input_data.username}, session_id: {session_id}")
         await session_store.create_session(
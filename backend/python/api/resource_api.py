@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Response, status, Depends
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional, Union
+from fastapi import APIRouter, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
 from schema.resource_schema import CreateResourceRequestSchema, CreateResourceResponseSchema, GetResourceResponseSchema, GetAllResourcesResponseSchema, UpdateResourceRequestSchema
 from schema.common_schema import ErrorResponseSchema, SuccessResponseSchema
-from utils import uuid_utils
+from utils import uuid_utils, response_utils
 from dao.resource_dao import ResourceDao
-from core.bootstrap import get_resource_dao
+from core.bootstrap import get_resource_dao, get_resource_event_bus
+from core.event_bus import EventBus, Subscription
 from core.logger import Logger
+from config.constants import MAX_RESOURCES_PAGE_SIZE, RESOURCE_EVENTS_HEARTBEAT_SECONDS, RESOURCE_EVENTS_MAX_STREAM_SECONDS
 
 
 resource_api_router = APIRouter()
@@ -39,21 +46,76 @@ async def create_resource(input_data: CreateResourceRequestSchema, response: Res
     response.status_code = status.HTTP_201_CREATED
     return CreateResourceResponseSchema(resourceId=resource_data['id'], name=input_data.name, properties=input_data.properties)
 
-@resource_api_router.get("/resources")
-async def get_all_resources(response: Response, resource_dao: ResourceDao = Depends(get_resource_dao)):
-    logger.info("Received request to fetch all resources")
+@resource_api_router.get("/resources", response_model=Union[GetAllResourcesResponseSchema, ErrorResponseSchema])
+async def get_all_resources(response: Response, after: Optional[str] = None, limit: Optional[int] = None, resource_dao: ResourceDao = Depends(get_resource_dao)):
+    logger.info(f"Received request to fetch all resources (after: {after}, limit: {limit})")
 
-    resources, err = await resource_dao.get_all_resources()
+    if limit is not None and not 1 <= limit <= MAX_RESOURCES_PAGE_SIZE:
+        logger.warning(f"Invalid page limit: {limit}")
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return ErrorResponseSchema(error=f"Limit must be between 1 and {MAX_RESOURCES_PAGE_SIZE}.")
+
+    paginated = after is not None or limit is not None
+    page_limit = limit or MAX_RESOURCES_PAGE_SIZE
+    if paginated:
+        resources, err = await resource_dao.get_resources_page(after=after, limit=page_limit)
+    else:
+        resources, err = await resource_dao.get_all_resources()
     if err:
         logger.error(f"Error while fetching all resources. Error: {err}")
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return ErrorResponseSchema(error="Failed to fetch all resources.")
-    
-    logger.info(f"Successfully retrieved {len(resources)} resources")
-    response.status_code = status.HTTP_200_OK
-    return GetAllResourcesResponseSchema(items=[GetResourceResponseSchema(resourceId=resource['id'], name=resource['name'], properties=resource['properties']) for resource in resources], total=len(resources))
 
-@resource_api_router.get("/resources/{resource_id}")
+    # Resources are ordered by their time-ordered IDs, so the last ID is the keyset cursor for the next page
+    next_cursor = resources[-1]['id'] if paginated and len(resources) == page_limit else None
+
+    logger.info(f"Successfully retrieved {len(resources)} resources")
+    items = [{"resourceId": resource['id'], "name": resource['name'], "properties": resource['properties']} for resource in resources]
+    return response_utils.trusted_json_response({"items": items, "total": len(resources), "nextCursor": next_cursor}, status.HTTP_200_OK)
+
+def _format_resource_event(event_id: str, event_type: str, data: dict) -> str:
+    """Format a resource change as a server-sent event, with the resource in the API's field names."""
+    payload = {"resourceId": data["id"]}
+    if event_type != "resource.deleted":
+        payload.update(name=data.get("name"), properties=data.get("properties"))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+async def _stream_resource_events(event_bus: EventBus, subscription: Subscription) -> AsyncIterator[str]:
+    # The stream ends after RESOURCE_EVENTS_MAX_STREAM_SECONDS; EventSource clients reconnect with
+    # Last-Event-ID, and the server never waits long for open streams when shutting down
+    deadline = time.monotonic() + RESOURCE_EVENTS_MAX_STREAM_SECONDS
+    try:
+        # Sent right away so the response headers reach the client before the first event
+        yield ": stream opened\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = await subscription.next_event(min(RESOURCE_EVENTS_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                if subscription.resync:
+                    # Events were lost for this subscriber: it has to fetch GET /resources again. The ID
+                    # makes it reconnect from the current event instead of the one it cannot resume from.
+                    yield f"id: {event_bus.last_event_id}\nevent: resync\ndata: {{}}\n\n"
+                break
+            yield _format_resource_event(*event)
+    finally:
+        event_bus.unsubscribe(subscription)
+        logger.info("Resource change feed stream closed.")
+
+@resource_api_router.get("/resources/events")
+async def stream_resource_events(request: Request, event_bus: EventBus = Depends(get_resource_event_bus)):
+    last_event_id = request.headers.get("last-event-id")
+    logger.info(f"Received request to stream resource changes (Last-Event-ID: {last_event_id})")
+    subscription = event_bus.subscribe(last_event_id)
+    return StreamingResponse(_stream_resource_events(event_bus, subscription), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@resource_api_router.get("/resources/{resource_id}", response_model=Union[GetResourceResponseSchema, ErrorResponseSchema])
 async def get_resource(resource_id: str, response: Response, resource_dao: ResourceDao = Depends(get_resource_dao)):
     logger.info(f"Received request to get resource with resource_id: {resource_id}")
 
@@ -74,8 +136,7 @@ async def get_resource(resource_id: str, response: Response, resource_dao: Resou
         return ErrorResponseSchema(error="Resource not found.")
 
     logger.info(f"Successfully retrieved resource data for resource_id: {resource_id}")
-    response.status_code = status.HTTP_200_OK
-    return GetResourceResponseSchema(resourceId=resource_data["id"], name=resource_data["name"], properties=resource_data["properties"])
+    return response_utils.trusted_json_response({"resourceId": resource_data["id"], "name": resource_data["name"], "properties": resource_data["properties"]}, status.HTTP_200_OK)
 
 @resource_api_router.put("/resources/{resource_id}")
 async def update_resource(resource_id: str, input_data: UpdateResourceRequestSchema, response: Response, resource_dao: ResourceDao = Depends(get_resource_dao)):
@@ -1,15 +1,18 @@
+from typing import Union
 from fastapi import APIRouter, Response, status, Depends
-from schema.user_schema import CreateUserRequestSchema, UpdateUserRequestSchema, CreateUserResponseSchema, GetUserResponseSchema, GetAllUsersResponseSchema
+from schema.user_schema import CreateUserRequestSchema, UpdateUserRequestSchema, CreateUserResponseSchema, GetUserResponseSchema, GetAllUsersResponseSchema, RevokeUserSessionsResponseSchema
 from schema.common_schema import ErrorResponseSchema, SuccessResponseSchema
-from utils import user_utils, uuid_utils
+from utils import user_utils, uuid_utils, response_utils
 from dao.user_dao import UserDao
-from core.bootstrap import get_user_dao
+from core.bootstrap import get_user_dao, get_session_store
+from core.middleware import validate_admin_session_in_request
+from core.adapters.session_store.base_session_store import BaseSessionStore
 from core.logger import Logger
 
 user_api_router = APIRouter()
 logger = Logger.get_logger(__name__)
 
-@user_api_router.get("/users/{user_id}")
+@user_api_router.get("/users/{user_id}", response_model=Union[GetUserResponseSchema, ErrorResponseSchema])
 async def get_user(user_id: str, response: Response, user_dao: UserDao = Depends(get_user_dao)):
     logger.info(f"Received request to get user with user_id: {user_id}")
 
@@ -30,8 +33,7 @@ async def get_user(user_id: str, response: Response, user_dao: UserDao = Depends
         return ErrorResponseSchema(error="User not found.")
 
     logger.info(f"Successfully retrieved user data for user_id: {user_id}")
-    response.status_code = status.HTTP_200_OK
-    return GetUserResponseSchema(userId=user_data["id"], username=user_data["username"], role=user_data["role"])
+    return response_utils.trusted_json_response({"userId": user_data["id"], "username": user_data["username"], "role": user_data["role"]}, status.HTTP_200_OK)
 
 
 @user_api_router.post("/users")
@@ -80,7 +82,8 @@ async def create_user(input_data: CreateUserRequestSchema, response: Response, u
 
 
 @user_api_router.put("/users/{user_id}")
-async def update_user(user_id: str, input_data: UpdateUserRequestSchema, response: Response, user_dao: UserDao = Depends(get_user_dao)):
+async def update_user(user_id: str, input_data: UpdateUserRequestSchema, response: Response, user_dao: UserDao = Depends(get_user_dao),
+                      session_store: BaseSessionStore = Depends(get_session_store)):
     logger.info(f"Received request to update user with user_id: {user_id}")
 
     if not user_id:
@@ -119,13 +122,23 @@ async def update_user(user_id: str, input_data: UpdateUserRequestSchema, respons
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return ErrorResponseSchema(error="Failed to update user.")
 
+    if "role" in update_data and update_data["role"] != user_data["role"]:
+        logger.info(f"Role changed for username: {user_data['username']}, revoking their sessions.")
+        try:
+            await session_store.delete_sessions_for_user(user_data["username"])
+        except Exception as e:
+            logger.error(f"Failed to revoke sessions for user_id: {user_id} after role change. Error: {e}")
+            response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            return ErrorResponseSchema(error="User updated, but revoking their sessions failed; sessions with the old role may remain.")
+
     logger.info(f"User updated successfully with user_id: {user_id}")
     response.status_code = status.HTTP_200_OK
     return GetUserResponseSchema(userId=updated_user_data["id"], username=updated_user_data["username"], role=updated_user_data["role"])
 
 
 @user_api_router.delete("/users/{user_id}")
-async def delete_user(user_id: str, response: Response, user_dao: UserDao = Depends(get_user_dao)):
+async def delete_user(user_id: str, response: Response, user_dao: UserDao = Depends(get_user_dao),
+                      session_store: BaseSessionStore = Depends(get_session_store)):
     logger.info(f"Received request to delete user with user_id: {user_id}")
 
     if not user_id:
@@ -150,12 +163,47 @@ async def delete_user(user_id: str, response: Response, user_dao: UserDao = Depe
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return ErrorResponseSchema(error="Failed to delete user.")
 
+    logger.info(f"Revoking sessions of deleted username: {user_data['username']}")
+    try:
+        await session_store.delete_sessions_for_user(user_data["username"])
+    except Exception as e:
+        logger.error(f"Failed to revoke sessions of deleted user_id: {user_id}. Error: {e}")
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return ErrorResponseSchema(error="User deleted, but revoking their sessions failed; sessions may remain.")
+
     logger.info(f"User deleted successfully with user_id: {user_id}")
     response.status_code = status.HTTP_200_OK
     return SuccessResponseSchema(message="User deleted successfully.")
 
 
-@user_api_router.get("/users")
+@user_api_router.delete("/users/{user_id}/sessions", dependencies=[Depends(validate_admin_session_in_request)])
+async def revoke_user_sessions(user_id: str, response: Response, user_dao: UserDao = Depends(get_user_dao),
+                               session_store: BaseSessionStore = Depends(get_session_store)):
+    logger.info(f"Received request to revoke all sessions for user_id: {user_id}")
+
+    user_data, err = await user_dao.get_user(user_id)
+    if err:
+        logger.error(f"Error occurred while fetching user data for user_id: {user_id}. Error: {err}")
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return ErrorResponseSchema(error="Failed to revoke user sessions.")
+    if not user_data:
+        logger.warning(f"User with user_id: {user_id} does not exist.")
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return ErrorResponseSchema(error="User not found.")
+
+    try:
+        revoked = await session_store.delete_sessions_for_user(user_data["username"])
+    except Exception as e:
+        logger.error(f"Failed to revoke sessions for user_id: {user_id}. Error: {e}")
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return ErrorResponseSchema(error="Failed to revoke user sessions.")
+
+    logger.info(f"Revoked {revoked} sessions for user_id: {user_id}")
+    response.status_code = status.HTTP_200_OK
+    return RevokeUserSessionsResponseSchema(message="User sessions revoked successfully.", revoked=revoked)
+
+
+@user_api_router.get("/users", response_model=Union[GetAllUsersResponseSchema, ErrorResponseSchema])
 async def get_all_users(response: Response, user_dao: UserDao = Depends(get_user_dao)):
     logger.info("Received request to fetch all users.")
 
@@ -166,5 +214,5 @@ async def get_all_users(response: Response, user_dao: UserDao = Depends(get_user
         return ErrorResponseSchema(error="Failed to retrieve users.")
 
     logger.info(f"Successfully retrieved {len(users)} users.")
-    response.status_code = status.HTTP_200_OK
-    return GetAllUsersResponseSchema(items=[GetUserResponseSchema(userId=user["id"], username=user["username"], role=user["role"]) for user in users], total=len(users))
+    items = [{"userId": user["id"], "username": user["username"], "role": user["role"]} for user in users]
+    return response_utils.trusted_json_response({"items": items, "total": len(users)}, status.HTTP_200_OK)
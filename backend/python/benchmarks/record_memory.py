@@ -0,0 +1,64 @@
+"""
+Memory benchmark: bytes per user record held by JsonFileDB, as plain dicts vs compact records.
+
+    python -m benchmarks.record_memory [--count 1000000]
+
+Records are produced by json.loads, as JsonFileDB does when loading a collection file, so every
+string value is a separate object just like in the real index. Sizes are measured with tracemalloc
+and include the record's strings and the list holding the records.
+
+Result on CPython 3.11, 1M users: ~499 bytes/record as dicts, ~331 bytes/record compact (-34%).
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from core.adapters.db.compact_record import UserRecord
+from utils import uuid_utils
+
+FAKE_PASSWORD_HASH = "$2b$12$" + "x" * 53  # same length as a bcrypt hash
+
+
+def _load_users(count: int) -> list:
+    users = [{"id": uuid_utils.generate_uuid7(), "username": f"user{i:07d}", "password": FAKE_PASSWORD_HASH,
+              "role": "ADMIN" if i % 10 == 0 else "OBSERVER"} for i in range(count)]
+    return json.loads(json.dumps({"records": users}))["records"]
+
+
+def _measure(build) -> int:
+    """Bytes still allocated after build() returns, while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    as_dicts = _measure(lambda: _load_users(args.count))
+
+    def build_compact():
+        users = _load_users(args.count)
+        compact = [UserRecord.from_dict(user) for user in users]
+        del users
+        return compact
+
+    # The intermediate dicts are freed before measuring, so only the compact records remain
+    as_compact = _measure(build_compact)
+
+    print(f"records: {args.count}")
+    print(f"dict:    {as_dicts / args.count:8.1f} bytes/record  {as_dicts / 2**20:8.1f} MiB")
+    print(f"compact: {as_compact / args.count:8.1f} bytes/record  {as_compact / 2**20:8.1f} MiB")
+    print(f"saved:   {(1 - as_compact / as_dicts) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
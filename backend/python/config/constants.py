@@ -1,11 +1,63 @@
 import os
 
 DB_TYPE = os.getenv("DB_TYPE", "json_file")
+DB_SHARD_COUNT = int(os.getenv("DB_SHARD_COUNT", "1"))
+DB_GROUP_COMMIT_MAX_BATCH_SIZE = int(os.getenv("DB_GROUP_COMMIT_MAX_BATCH_SIZE", "256"))
+DB_GROUP_COMMIT_MAX_DELAY_SECONDS = float(os.getenv("DB_GROUP_COMMIT_MAX_DELAY_SECONDS", "0.002"))
 SESSION_STORE_TYPE = os.getenv("SESSION_STORE_TYPE", "json_file")
+RECORD_ID_GENERATOR = os.getenv("RECORD_ID_GENERATOR", "uuid7")  # uuid7 | ulid | uuid4
+MAX_RESOURCES_PAGE_SIZE = 1000
+RESOURCE_EVENTS_BUFFER_SIZE = int(os.getenv("RESOURCE_EVENTS_BUFFER_SIZE", "1000"))
+RESOURCE_EVENTS_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("RESOURCE_EVENTS_SUBSCRIBER_QUEUE_SIZE", "256"))
+RESOURCE_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("RESOURCE_EVENTS_HEARTBEAT_SECONDS", "15"))
+RESOURCE_EVENTS_MAX_STREAM_SECONDS = float(os.getenv("RESOURCE_EVENTS_MAX_STREAM_SECONDS", "300"))
 MIN_USERNAME_LENGTH = 3
 MAX_USERNAME_LENGTH = 30
 MIN_PASSWORD_LENGTH = 6
 MAX_PASSWORD_LENGTH = 50
 BUILT_IN_ROLES = ["ADMIN", "OBSERVER"]
 SESSION_STORE_JSON_FILE_PATH = "sessions.json"
-SESSION_EXPIRY_SECONDS = 3600  # 1 hour
\ No newline at end of file
+SESSION_STORE_APPEND_LOG_FILE_PATH = "sessions.log"
+SESSION_STORE_DURABILITY = os.getenv("SESSION_STORE_DURABILITY", "sync")  # sync | batched | snapshot
+SESSION_STORE_FLUSH_INTERVAL_SECONDS = float(os.getenv("SESSION_STORE_FLUSH_INTERVAL_SECONDS", "1"))
+SESSION_STORE_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SESSION_STORE_SNAPSHOT_INTERVAL_SECONDS", "30"))
+SESSION_EXPIRY_SECONDS = 3600  # 1 hour
+SESSION_STORE_SQLITE_PATH = os.getenv("SESSION_STORE_SQLITE_PATH", "sessions.db")
+SESSION_STORE_SQLITE_PURGE_INTERVAL_SECONDS = float(os.getenv("SESSION_STORE_SQLITE_PURGE_INTERVAL_SECONDS", "300"))
+SESSION_STORE_REDIS_URL = os.getenv("SESSION_STORE_REDIS_URL", "redis://localhost:6379/0")
+SESSION_STORE_REDIS_MAX_CONNECTIONS = int(os.getenv("SESSION_STORE_REDIS_MAX_CONNECTIONS", "20"))
+SESSION_STORE_REDIS_KEY_PREFIX = "session:"
+SESSION_STORE_REDIS_USER_INDEX_PREFIX = "user_sessions:"
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "false").lower() == "true"
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "5"))
+SESSION_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_NEGATIVE_TTL_SECONDS", "1"))
+SESSION_SHARED_CACHE_ENABLED = os.getenv("SESSION_SHARED_CACHE_ENABLED", "false").lower() == "true"
+SESSION_SHARED_CACHE_NAME = os.getenv("SESSION_SHARED_CACHE_NAME", "session_based_login_sessions")
+SESSION_SHARED_CACHE_SLOTS = int(os.getenv("SESSION_SHARED_CACHE_SLOTS", "65536"))
+LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() == "true"
+LOGIN_RATE_LIMIT_STORE_TYPE = os.getenv("LOGIN_RATE_LIMIT_STORE_TYPE", "memory")
+LOGIN_RATE_LIMIT_USERNAME_CAPACITY = int(os.getenv("LOGIN_RATE_LIMIT_USERNAME_CAPACITY", "5"))
+LOGIN_RATE_LIMIT_IP_CAPACITY = int(os.getenv("LOGIN_RATE_LIMIT_IP_CAPACITY", "20"))
+LOGIN_RATE_LIMIT_REFILL_PER_SECOND = float(os.getenv("LOGIN_RATE_LIMIT_REFILL_PER_SECOND", "0.1"))
+LOGIN_RATE_LIMIT_BASE_LOCKOUT_SECONDS = int(os.getenv("LOGIN_RATE_LIMIT_BASE_LOCKOUT_SECONDS", "30"))
+LOGIN_RATE_LIMIT_MAX_LOCKOUT_SECONDS = int(os.getenv("LOGIN_RATE_LIMIT_MAX_LOCKOUT_SECONDS", "3600"))
+LOGIN_RATE_LIMIT_MAX_BUCKETS = int(os.getenv("LOGIN_RATE_LIMIT_MAX_BUCKETS", "100000"))
+LOGIN_RATE_LIMIT_REDIS_URL = os.getenv("LOGIN_RATE_LIMIT_REDIS_URL", SESSION_STORE_REDIS_URL)
+LOGIN_RATE_LIMIT_REDIS_KEY_PREFIX = "login_rate:"
+USERNAME_FILTER_ENABLED = os.getenv("USERNAME_FILTER_ENABLED", "true").lower() == "true"
+USERNAME_FILTER_CAPACITY = int(os.getenv("USERNAME_FILTER_CAPACITY", "100000"))
+USERNAME_FILTER_FALSE_POSITIVE_RATE = float(os.getenv("USERNAME_FILTER_FALSE_POSITIVE_RATE", "0.01"))
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+RESPONSE_COMPRESSION_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_COMPRESSION_CACHE_MAX_ENTRIES", "256"))
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
+MEMORY_SNAPSHOTS_MAX = int(os.getenv("MEMORY_SNAPSHOTS_MAX", "5"))
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_MONITOR_INTERVAL_SECONDS = float(os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", "0.1"))
+LOOP_MONITOR_BLOCK_THRESHOLD_SECONDS = float(os.getenv("LOOP_MONITOR_BLOCK_THRESHOLD_SECONDS", "0.1"))
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "1"))  # 0 = one worker per CPU core
+SERVE_GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("SERVE_GRACEFUL_TIMEOUT_SECONDS", "30"))
\ No newline at end of file
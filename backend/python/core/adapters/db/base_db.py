@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 
@@ -85,4 +86,68 @@ class BaseDB(ABC):
         Returns:
             bool: True if the record was deleted, False otherwise.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def get_records_in_range(self, collection: str, start_id: Optional[str] = None, end_id: Optional[str] = None,
+                                   limit: Optional[int] = None, include_start: bool = True) -> List[Dict]:
+        """
+        Retrieve records in ascending ID order with start_id <= id < end_id (start_id < id if not include_start).
+
+        With time-ordered IDs this is a scan by creation time, and a keyset page when passing the last
+        ID of the previous page as start_id with include_start=False. The default implementation sorts
+        all records; adapters with a sorted index should override it.
+
+        Args:
+            collection (str): The name of the collection.
+            start_id (Optional[str]): Lower ID bound, or None for no lower bound.
+            end_id (Optional[str]): Exclusive upper ID bound, or None for no upper bound.
+            limit (Optional[int]): Maximum number of records to return.
+            include_start (bool): Whether a record with ID equal to start_id is included.
+
+        Returns:
+            List[Dict]: The records in the range, ordered by ID.
+        """
+        records = sorted((record for record in await self.get_all_records(collection) if record.get("id") is not None),
+                         key=lambda record: record["id"])
+        records = [record for record in records
+                   if (start_id is None or record["id"] > start_id or (include_start and record["id"] == start_id))
+                   and (end_id is None or record["id"] < end_id)]
+        return records if limit is None else records[:limit]
+
+    async def warm_up(self, collections: List[str]) -> None:
+        """
+        Load the given collections so the first requests after startup do not pay cold-read costs.
+
+        The default implementation reads every collection concurrently; adapters may override it.
+
+        Args:
+            collections (List[str]): The names of the collections to warm up.
+        """
+        await asyncio.gather(*(self.get_all_records(collection) for collection in collections))
+
+    async def collection_version(self, collection: str) -> Optional[object]:
+        """
+        Get a token that changes whenever the collection is changed, by this process or another one.
+
+        Caches derived from a collection (e.g. the username filter) compare tokens to tell whether
+        they are still current. The default implementation returns None, meaning changes cannot be
+        detected and such caches must not be trusted.
+
+        Args:
+            collection (str): The name of the collection.
+
+        Returns:
+            Optional[object]: A comparable token, or None if the adapter cannot tell.
+        """
+        return None
+
+    def memory_usage(self) -> Dict:
+        """
+        Estimate the memory held by the database adapter in this process, for the admin memory report.
+
+        The default implementation reports nothing; adapters that keep records in memory override it.
+
+        Returns:
+            Dict: Entry counts and estimated sizes in bytes, keyed by what they measure.
+        """
+        return {}
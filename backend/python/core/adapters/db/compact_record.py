@@ -0,0 +1,69 @@
+from typing import Dict, Optional, Tuple, Type
+from config.constants import BUILT_IN_ROLES
+
+# Single shared string object per built-in role; json.loads creates a new string for every value
+_INTERNED_ROLES = {role: role for role in BUILT_IN_ROLES}
+
+# Marks a fixed field that is absent from the record, so it is left out again when converting back
+_ABSENT = object()
+
+
+class CompactRecord:
+    """
+    Base class of the compact in-memory representation of records with a known set of fields.
+
+    Fixed fields are stored in `__slots__` instead of a per-record dict; any other fields go to
+    `extra`, which stays None for records that have only the fixed fields. Subclasses declare
+    `FIELDS`, and `__slots__` as FIELDS plus "extra".
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompactRecord":
+        record = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(record, field, data.get(field, _ABSENT))
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        record.extra = extra or None
+        return record
+
+    def to_dict(self) -> dict:
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not _ABSENT:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class UserRecord(CompactRecord):
+    FIELDS = ("id", "username", "password", "role")
+    __slots__ = FIELDS + ("extra",)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UserRecord":
+        record = super().from_dict(data)
+        if isinstance(record.role, str):
+            record.role = _INTERNED_ROLES.get(record.role, record.role)
+        return record
+
+
+class ResourceRecord(CompactRecord):
+    FIELDS = ("id", "name", "properties")
+    __slots__ = FIELDS + ("extra",)
+
+
+# Collections held in compact form; other collections are kept as plain dicts
+COMPACT_RECORD_CLASSES: Dict[str, Type[CompactRecord]] = {
+    "users": UserRecord,
+    "resources": ResourceRecord,
+}
+
+
+def get_compact_record_class(collection: str) -> Optional[Type[CompactRecord]]:
+    """Get the compact record class used for a collection, or None to keep its records as dicts."""
+    return COMPACT_RECORD_CLASSES.get(collection)
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+# (operation, record ID, data): ("create", id, record), ("update", id, changes) or ("delete", id, None)
+Mutation = Tuple[str, Optional[str], Optional[dict]]
+
+
+class GroupCommitWriter:
+    """
+    Group commit of the mutations of one collection file.
+
+    Callers submit mutations and wait for their result. A single flusher task collects the pending
+    mutations (up to `max_batch_size`, waiting at most `max_delay_seconds` for a batch to fill) and hands
+    them to `commit`, which applies them all and persists the file once. Mutations submitted while a
+    batch is being committed form the next batch, so under load N concurrent writes cost one rewrite.
+    """
+
+    def __init__(self, commit: Callable[[List[Mutation]], Awaitable[List[Any]]], max_batch_size: int,
+                 max_delay_seconds: float):
+        self._commit = commit
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay_seconds = max_delay_seconds
+        self._pending: List[Tuple[Mutation, asyncio.Future]] = []
+        self._batch_full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def submit(self, mutation: Mutation) -> Any:
+        """Queue a mutation and wait until the batch containing it has been written."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((mutation, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_pending())
+        return await future
+
+    async def drain(self) -> None:
+        """Wait until every submitted mutation has been committed."""
+        while self._flusher is not None and not self._flusher.done():
+            await asyncio.shield(self._flusher)
+
+    async def _flush_pending(self) -> None:
+        while self._pending:
+            if self.max_delay_seconds > 0 and len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_delay_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:len(batch)]
+            logger.debug(f"Committing a batch of {len(batch)} mutations.")
+            try:
+                results = await self._commit([mutation for mutation, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
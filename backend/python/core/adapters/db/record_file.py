@@ -0,0 +1,241 @@
+"""
+On-disk layout of JsonFileDB collection files and their offset index sidecars.
+
+A collection file is a JSON document with one compact record per line:
+
+    {"records": [
+    {"id":"...","name":"..."},
+    {"id":"...","name":"..."}
+    ]}
+
+It is still a valid `{"records": [...]}` document, but it can be read incrementally from a memory map
+one line at a time, and a single record can be located by byte offset. Files in the older indented
+layout are still read (by parsing the whole document).
+
+With N > 1 shards a collection is split into `<collection>.<shard>.json` files by a hash of the record
+ID; the shard count the data directory was written with is kept in `shards.json`.
+
+The offset index sidecar (`<collection>.idx`, or `<collection>.<shard>.idx` per shard) maps record IDs
+to (offset, length) in the collection file. It is a header line holding the (mtime, size) of the
+collection file it describes, followed by fixed-width lines sorted by ID, so an ID is found by binary
+search over a memory map without parsing anything.
+
+Every file is written to a unique temporary file in the same directory and renamed over the previous
+version, so readers (in this or another process) see either the old or the new file, never a partial one.
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+import stat
+import tempfile
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+RECORDS_HEADER = '{"records": [\n'
+RECORDS_FOOTER = ']}\n'
+OFFSET_INDEX_SUFFIX = ".idx"
+OFFSET_INDEX_ID_WIDTH = 40
+OFFSET_INDEX_LINE_SIZE = 64  # ID (40) + offset (14) + length (9) + newline
+TEMP_FILE_SUFFIX = ".tmp"
+LOCK_FILE_SUFFIX = ".lock"
+
+SHARD_METADATA_FILE = "shards.json"
+COLLECTION_FILE_PATTERN = re.compile(r"^(?P<collection>[^.]+)(?:\.(?P<shard>\d+))?\.json$")
+
+_RECORDS_HEADER_BYTES = RECORDS_HEADER.encode("ascii")
+_RECORDS_FOOTER_LINE = RECORDS_FOOTER.rstrip("\n").encode("ascii")
+
+
+def write_file_atomically(file_path: str, content: str, durable: bool = True) -> os.stat_result:
+    """
+    Replace a file with `content` through a unique temporary file and a rename. With `durable` the
+    content is fsynced before the rename. Returns the stat of the new file.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".",
+                                     prefix=os.path.basename(file_path) + ".", suffix=TEMP_FILE_SUFFIX)
+    try:
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(content)
+            f.flush()
+            if durable:
+                os.fsync(f.fileno())
+            file_stat = os.fstat(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return file_stat
+
+
+def write_collection_file(file_path: str, records: List[dict]) -> Tuple[Tuple[int, int], Dict[str, Tuple[int, int]]]:
+    """Write a collection file atomically and durably. Returns its (mtime, size) signature and the record offsets."""
+    content, offsets = format_records(records)
+    file_stat = write_file_atomically(file_path, content)
+    return (file_stat.st_mtime_ns, file_stat.st_size), offsets
+
+
+def shard_for_id(record_id: Optional[str], shard_count: int) -> int:
+    """Shard of a record. Uses a stable hash (not hash()), so every process routes IDs the same way."""
+    if shard_count <= 1 or not record_id:
+        return 0
+    digest = hashlib.blake2b(record_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % shard_count
+
+
+def collection_file_path(data_dir: str, collection: str, shard: int, shard_count: int) -> str:
+    if shard_count <= 1:
+        return os.path.join(data_dir, f"{collection}.json")
+    return os.path.join(data_dir, f"{collection}.{shard}.json")
+
+
+def read_shard_count(data_dir: str) -> Optional[int]:
+    """Shard count recorded for a data directory, or None if it was never recorded."""
+    try:
+        with open(os.path.join(data_dir, SHARD_METADATA_FILE), "r") as f:
+            return int(json.load(f)["shard_count"])
+    except FileNotFoundError:
+        return None
+
+
+def write_shard_count(data_dir: str, shard_count: int) -> None:
+    write_file_atomically(os.path.join(data_dir, SHARD_METADATA_FILE), json.dumps({"shard_count": shard_count}))
+
+
+def list_collection_files(data_dir: str) -> Dict[str, Set[Optional[int]]]:
+    """Collections in a data directory, with the shard numbers of their files (None for an unsharded file)."""
+    collections: Dict[str, Set[Optional[int]]] = {}
+    for name in os.listdir(data_dir):
+        match = COLLECTION_FILE_PATTERN.match(name)
+        if match is None or name == SHARD_METADATA_FILE:
+            continue
+        shard = match.group("shard")
+        collections.setdefault(match.group("collection"), set()).add(int(shard) if shard is not None else None)
+    return collections
+
+
+def iter_records(file_path: str) -> Iterator[dict]:
+    """Yield the records of a collection file one by one, parsing it incrementally from a memory map."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(_RECORDS_HEADER_BYTES)] != _RECORDS_HEADER_BYTES:
+                # Older indented layout: records span several lines, so parse the whole document
+                yield from json.loads(mm[:]).get("records", [])
+                return
+            position = len(_RECORDS_HEADER_BYTES)
+            while True:
+                end = mm.find(b"\n", position)
+                if end == -1:
+                    end = len(mm)
+                line = mm[position:end]
+                position = end + 1
+                if not line or line == _RECORDS_FOOTER_LINE:
+                    return
+                yield json.loads(line.rstrip(b","))
+
+
+def format_records(records: List[dict]) -> Tuple[str, Dict[str, Tuple[int, int]]]:
+    """
+    Serialize records in the line-per-record layout.
+
+    Returns the file content and the (offset, length) of every record line by ID. JSON is written
+    with ensure_ascii, so string offsets are byte offsets.
+    """
+    parts = [RECORDS_HEADER]
+    offsets = {}
+    position = len(RECORDS_HEADER)
+    last = len(records) - 1
+    for i, record in enumerate(records):
+        line = json.dumps(record, separators=(",", ":"))
+        record_id = record.get("id")
+        if isinstance(record_id, str):
+            offsets[record_id] = (position, len(line))
+        line += ",\n" if i < last else "\n"
+        parts.append(line)
+        position += len(line)
+    parts.append(RECORDS_FOOTER)
+    return "".join(parts), offsets
+
+
+def lock_file_path(file_path: str) -> str:
+    """Lock file that serializes writes of a collection file across processes."""
+    return os.path.splitext(file_path)[0] + LOCK_FILE_SUFFIX
+
+
+def offset_index_path(file_path: str) -> str:
+    return os.path.splitext(file_path)[0] + OFFSET_INDEX_SUFFIX
+
+
+def write_offset_index(file_path: str, signature: Tuple[int, int], offsets: Dict[str, Tuple[int, int]]) -> None:
+    """Write the offset index sidecar of a collection file, atomically replacing the previous one."""
+    index_path = offset_index_path(file_path)
+    if any(len(record_id) > OFFSET_INDEX_ID_WIDTH or not record_id.isascii() for record_id in offsets):
+        # IDs that do not fit the fixed-width layout: drop the sidecar, lookups fall back to the full index
+        remove_offset_index(file_path)
+        return
+    lines = [f"{signature[0]} {signature[1]}".ljust(OFFSET_INDEX_LINE_SIZE - 1) + "\n"]
+    for record_id in sorted(offsets):
+        offset, length = offsets[record_id]
+        lines.append(f"{record_id:<{OFFSET_INDEX_ID_WIDTH}}{offset:>14}{length:>9}\n")
+    # Only an optimization (lookups check its signature), so it is not fsynced
+    write_file_atomically(index_path, "".join(lines), durable=False)
+
+
+def remove_offset_index(file_path: str) -> None:
+    try:
+        os.remove(offset_index_path(file_path))
+    except FileNotFoundError:
+        pass
+
+
+def lookup_offset(file_path: str, signature: Tuple[int, int], record_id: str) -> Optional[Tuple[int, int]]:
+    """
+    Find a record's (offset, length) in the offset index sidecar by binary search.
+
+    Returns None if there is no sidecar, it describes a different version of the collection file than
+    `signature`, or the ID is not in it.
+    """
+    index_path = offset_index_path(file_path)
+    try:
+        f = open(index_path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < OFFSET_INDEX_LINE_SIZE or size % OFFSET_INDEX_LINE_SIZE:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = mm[:OFFSET_INDEX_LINE_SIZE].split()
+            if tuple(int(value) for value in header) != tuple(signature):
+                return None
+            target = record_id.encode("ascii", errors="replace")
+            low, high = 1, size // OFFSET_INDEX_LINE_SIZE
+            while low < high:
+                middle = (low + high) // 2
+                start = middle * OFFSET_INDEX_LINE_SIZE
+                current = mm[start:start + OFFSET_INDEX_ID_WIDTH].rstrip(b" ")
+                if current < target:
+                    low = middle + 1
+                elif current > target:
+                    high = middle
+                else:
+                    entry = mm[start + OFFSET_INDEX_ID_WIDTH:start + OFFSET_INDEX_LINE_SIZE].split()
+                    return int(entry[0]), int(entry[1])
+    return None
+
+
+def read_record_at(file_path: str, offset: int, length: int) -> dict:
+    """Parse the single record stored at a byte offset of a collection file."""
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return json.loads(mm[offset:offset + length])
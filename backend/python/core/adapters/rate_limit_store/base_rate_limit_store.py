@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+class BaseRateLimitStore(ABC):
+    """
+    Abstract base class for rate limit state storage.
+    This class defines the interface that all rate limit store adapters must implement.
+    """
+
+    @abstractmethod
+    async def initialize(self) -> None:
+        """
+        Initialize the rate limit store.
+
+        This method is called during the startup phase to prepare the rate limit store.
+        """
+        pass
+
+    @abstractmethod
+    async def cleanup(self) -> None:
+        """
+        Cleanup the rate limit store.
+
+        This method is called during the shutdown phase to release any resources held by the rate limit store.
+        """
+        pass
+
+    @abstractmethod
+    async def get_bucket(self, key: str) -> Optional[Dict]:
+        """
+        Retrieve the state of a token bucket.
+
+        Args:
+            key (str): The bucket key (e.g. "username:admin:ip:10.0.0.1" or "ip:10.0.0.1").
+
+        Returns:
+            Optional[Dict]: The bucket state if present, otherwise None.
+        """
+        pass
+
+    @abstractmethod
+    async def set_bucket(self, key: str, data: Dict, ttl_seconds: int) -> None:
+        """
+        Store the state of a token bucket.
+
+        Args:
+            key (str): The bucket key.
+            data (Dict): The bucket state.
+            ttl_seconds (int): How long the state is worth keeping; after that the bucket is full again anyway.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_bucket(self, key: str) -> None:
+        """
+        Delete the state of a token bucket, resetting it.
+
+        Args:
+            key (str): The bucket key.
+        """
+        pass
+
+    def memory_usage(self) -> Dict:
+        """
+        Estimate the memory held by the rate limit store in this process, for the admin memory report.
+
+        The default implementation reports nothing; adapters that keep buckets in memory override it.
+
+        Returns:
+            Dict: Entry counts and estimated sizes in bytes, keyed by what they measure.
+        """
+        return {}
@@ -0,0 +1,50 @@
+from core.adapters.rate_limit_store.base_rate_limit_store import BaseRateLimitStore
+from core.logger import Logger
+from utils.memory_utils import estimate_dict_bytes
+from collections import OrderedDict
+import time
+from typing import Dict, Optional, Tuple
+
+logger = Logger.get_logger(__name__)
+
+class InMemoryRateLimitStore(BaseRateLimitStore):
+    def __init__(self, max_buckets: int):
+        """Initialize the in-memory rate limit store, bounded to `max_buckets` least recently used buckets."""
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+
+    async def initialize(self) -> None:
+        """Initialize the rate limit store (if needed)."""
+        logger.info(f"InMemoryRateLimitStore initialized with max_buckets: {self.max_buckets}.")
+
+    async def cleanup(self) -> None:
+        """Drop all buckets."""
+        self._buckets.clear()
+        logger.info("InMemoryRateLimitStore cleaned up.")
+
+    async def get_bucket(self, key: str) -> Optional[Dict]:
+        """Retrieve a bucket, dropping it if its TTL has passed."""
+        entry = self._buckets.get(key)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._buckets[key]
+            return None
+        self._buckets.move_to_end(key)
+        return data
+
+    async def set_bucket(self, key: str, data: Dict, ttl_seconds: int) -> None:
+        """Store a bucket, evicting the least recently used ones beyond `max_buckets`."""
+        self._buckets[key] = (data, time.monotonic() + ttl_seconds)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+
+    async def delete_bucket(self, key: str) -> None:
+        """Delete a bucket."""
+        self._buckets.pop(key, None)
+
+    def memory_usage(self) -> Dict:
+        """Number of buckets and their estimated size."""
+        return {"buckets": len(self._buckets), "max_buckets": self.max_buckets, "bytes": estimate_dict_bytes(self._buckets)}
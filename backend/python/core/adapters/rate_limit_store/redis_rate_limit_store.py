@@ -0,0 +1,60 @@
+from core.adapters.rate_limit_store.base_rate_limit_store import BaseRateLimitStore
+from core.adapters.session_store.in_memory_redis import InMemoryRedis
+from core.logger import Logger
+from config.constants import LOGIN_RATE_LIMIT_REDIS_URL, LOGIN_RATE_LIMIT_REDIS_KEY_PREFIX
+import json
+from typing import Dict, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only required when LOGIN_RATE_LIMIT_STORE_TYPE=redis
+    aioredis = None
+
+logger = Logger.get_logger(__name__)
+
+class RedisRateLimitStore(BaseRateLimitStore):
+    """
+    Rate limit store shared by all backend workers and nodes.
+
+    Bucket updates are read-modify-write without a transaction, so concurrent attempts
+    on different workers can occasionally both consume the same token.
+    """
+
+    def __init__(self, url: str = LOGIN_RATE_LIMIT_REDIS_URL, key_prefix: str = LOGIN_RATE_LIMIT_REDIS_KEY_PREFIX):
+        """Initialize the Redis rate limit store."""
+        self.url = url
+        self.key_prefix = key_prefix
+        self._client = None
+
+    async def initialize(self) -> None:
+        """Create the client and verify the server is reachable."""
+        if self.url.startswith("memory://"):
+            logger.info("Using in-process InMemoryRedis for RedisRateLimitStore.")
+            self._client = InMemoryRedis()
+        else:
+            if aioredis is None:
+                logger.error("The 'redis' package is required for LOGIN_RATE_LIMIT_STORE_TYPE=redis.")
+                raise RuntimeError("The 'redis' package is required for LOGIN_RATE_LIMIT_STORE_TYPE=redis.")
+            self._client = aioredis.Redis.from_url(self.url)
+        await self._client.ping()
+        logger.info("RedisRateLimitStore initialized.")
+
+    async def cleanup(self) -> None:
+        """Close the client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info("RedisRateLimitStore cleaned up.")
+
+    async def get_bucket(self, key: str) -> Optional[Dict]:
+        """Retrieve a bucket."""
+        raw = await self._client.get(f"{self.key_prefix}{key}")
+        return json.loads(raw) if raw is not None else None
+
+    async def set_bucket(self, key: str, data: Dict, ttl_seconds: int) -> None:
+        """Store a bucket with a native TTL."""
+        await self._client.setex(f"{self.key_prefix}{key}", max(1, int(ttl_seconds)), json.dumps(data, separators=(",", ":")))
+
+    async def delete_bucket(self, key: str) -> None:
+        """Delete a bucket."""
+        await self._client.delete(f"{self.key_prefix}{key}")
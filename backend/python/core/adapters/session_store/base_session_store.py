@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 class BaseSessionStore(ABC):
     """
@@ -59,6 +59,34 @@ class BaseSessionStore(ABC):
         """
         pass
 
+    @abstractmethod
+    async def list_sessions_for_user(self, username: str) -> List[str]:
+        """
+        List the IDs of all sessions belonging to a user.
+
+        Implementations maintain a username -> session IDs index, so this does not scan every session.
+
+        Args:
+            username (str): The username the sessions were created for.
+
+        Returns:
+            List[str]: The session IDs of the user's sessions.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_sessions_for_user(self, username: str) -> int:
+        """
+        Delete all sessions belonging to a user ("log out everywhere").
+
+        Args:
+            username (str): The username the sessions were created for.
+
+        Returns:
+            int: The number of sessions deleted.
+        """
+        pass
+
     @abstractmethod
     async def clear_sessions(self) -> None:
         """
@@ -66,4 +94,31 @@ class BaseSessionStore(ABC):
 
         This method removes all session data from the session store.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def warm_up(self) -> None:
+        """
+        Warm up the session store (e.g. load files or open connections) before traffic arrives.
+
+        The default implementation does nothing; adapters may override it.
+        """
+        pass
+
+    async def flush(self) -> None:
+        """
+        Persist changes that are buffered in memory (write-behind stores). Called on shutdown.
+
+        The default implementation does nothing; adapters may override it.
+        """
+        pass
+
+    def memory_usage(self) -> Dict:
+        """
+        Estimate the memory held by the session store in this process, for the admin memory report.
+
+        The default implementation reports nothing; adapters that keep sessions in memory override it.
+
+        Returns:
+            Dict: Entry counts and estimated sizes in bytes, keyed by what they measure.
+        """
+        return {}
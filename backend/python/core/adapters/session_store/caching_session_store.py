@@ -0,0 +1,131 @@
+from core.adapters.session_store.base_session_store import BaseSessionStore
+from core.logger import Logger
+from utils.memory_utils import estimate_dict_bytes
+from collections import OrderedDict
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = Logger.get_logger(__name__)
+
+# Cached value for session IDs the backend does not know about (negative caching).
+_MISSING = object()
+
+class CachingSessionStore(BaseSessionStore):
+    """
+    Session store decorator that keeps a bounded, short-lived local LRU cache in front of any backend.
+
+    Reads are served from the cache while an entry is fresh; unknown session IDs are cached
+    as misses for a (shorter) negative TTL. Writes and deletes go to the backend and then update
+    or invalidate the local entry. When several workers share one backend, pass
+    `publish_invalidation` to broadcast deletes and call `invalidate` when a broadcast is received.
+    """
+
+    def __init__(self, backend: BaseSessionStore, max_entries: int, ttl_seconds: float, negative_ttl_seconds: float,
+                 publish_invalidation: Optional[Callable[[str], Awaitable[None]]] = None):
+        """Initialize the caching session store."""
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.publish_invalidation = publish_invalidation
+        self._cache: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def initialize(self) -> None:
+        """Initialize the wrapped backend."""
+        await self.backend.initialize()
+        logger.info(f"CachingSessionStore initialized with max_entries: {self.max_entries}, ttl_seconds: {self.ttl_seconds}.")
+
+    async def cleanup(self) -> None:
+        """Drop the local cache and cleanup the wrapped backend."""
+        self._cache.clear()
+        await self.backend.cleanup()
+        logger.info("CachingSessionStore cleaned up.")
+
+    async def warm_up(self) -> None:
+        """Warm up the wrapped backend."""
+        await self.backend.warm_up()
+
+    async def flush(self) -> None:
+        """Flush the wrapped backend."""
+        await self.backend.flush()
+
+    def _put(self, session_id: str, value: object, ttl_seconds: float) -> None:
+        self._cache[session_id] = (value, time.monotonic() + ttl_seconds)
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _lookup(self, session_id: str) -> Optional[object]:
+        entry = self._cache.get(session_id)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[session_id]
+            return None
+        self._cache.move_to_end(session_id)
+        return value
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session from the local cache only (e.g. on an invalidation message from another worker)."""
+        logger.debug(f"Invalidating cached session with ID: {session_id}")
+        self._cache.pop(session_id, None)
+
+    async def create_session(self, session_id: str, data: Dict) -> None:
+        """Create a new session in the backend and cache it locally."""
+        await self.backend.create_session(session_id, data)
+        self._put(session_id, dict(data), self.ttl_seconds)
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        """Retrieve a session by its ID, consulting the local cache first."""
+        cached = self._lookup(session_id)
+        if cached is not None:
+            self.hits += 1
+            logger.debug(f"Session cache hit for ID: {session_id}")
+            return None if cached is _MISSING else dict(cached)
+
+        self.misses += 1
+        logger.debug(f"Session cache miss for ID: {session_id}")
+        session = await self.backend.get_session(session_id)
+        if session is None:
+            self._put(session_id, _MISSING, self.negative_ttl_seconds)
+            return None
+        self._put(session_id, dict(session), self.ttl_seconds)
+        return session
+
+    async def _invalidate_everywhere(self, session_id: str) -> None:
+        self.invalidate(session_id)
+        if self.publish_invalidation is not None:
+            try:
+                await self.publish_invalidation(session_id)
+            except Exception as e:
+                logger.error(f"Failed to publish invalidation for session ID: {session_id}. Error: {e}")
+
+    async def delete_session(self, session_id: str) -> None:
+        """Delete a session from the backend and invalidate it locally and on other workers."""
+        await self.backend.delete_session(session_id)
+        await self._invalidate_everywhere(session_id)
+
+    async def list_sessions_for_user(self, username: str) -> List[str]:
+        """List the session IDs of a user from the backend's index."""
+        return await self.backend.list_sessions_for_user(username)
+
+    async def delete_sessions_for_user(self, username: str) -> int:
+        """Delete all sessions of a user from the backend and invalidate each of them."""
+        session_ids = await self.backend.list_sessions_for_user(username)
+        deleted = await self.backend.delete_sessions_for_user(username)
+        for session_id in session_ids:
+            await self._invalidate_everywhere(session_id)
+        return deleted
+
+    async def clear_sessions(self) -> None:
+        """Clear all sessions from the backend and the local cache."""
+        await self.backend.clear_sessions()
+        self._cache.clear()
+
+    def memory_usage(self) -> Dict:
+        """Number of cached entries, their estimated size and the wrapped backend's usage."""
+        return {"cache_entries": len(self._cache), "max_entries": self.max_entries,
+                "cache_bytes": estimate_dict_bytes(self._cache), "backend": self.backend.memory_usage()}
@@ -0,0 +1,153 @@
+import fnmatch
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+class InMemoryRedis:
+    """
+    Minimal in-process stand-in for the `redis.asyncio.Redis` client.
+
+    Only the commands used by RedisSessionStore are implemented, with the same
+    call signatures and return types, so the store can run without a Redis server
+    (SESSION_STORE_REDIS_URL=memory://).
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Union[bytes, Set[bytes]], Optional[float]]] = {}
+        self._scans: Dict[int, List[str]] = {}
+        self._scan_id = 0
+
+    @staticmethod
+    def _name(name) -> str:
+        return name.decode("utf-8") if isinstance(name, bytes) else name
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    def _is_expired(self, key: str) -> bool:
+        entry = self._data.get(key)
+        if entry is None:
+            return True
+        _, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return True
+        return False
+
+    def _get_set(self, name: str) -> Set[bytes]:
+        if self._is_expired(name):
+            return set()
+        return self._data[name][0]
+
+    async def ping(self) -> bool:
+        return True
+
+    async def setex(self, name, time_seconds: int, value) -> bool:
+        self._data[self._name(name)] = (self._encode(value), time.monotonic() + int(time_seconds))
+        return True
+
+    async def get(self, name) -> Optional[bytes]:
+        name = self._name(name)
+        if self._is_expired(name):
+            return None
+        return self._data[name][0]
+
+    async def exists(self, *names) -> int:
+        return sum(0 if self._is_expired(self._name(name)) else 1 for name in names)
+
+    async def expire(self, name, time_seconds: int) -> bool:
+        name = self._name(name)
+        if self._is_expired(name):
+            return False
+        self._data[name] = (self._data[name][0], time.monotonic() + int(time_seconds))
+        return True
+
+    async def delete(self, *names) -> int:
+        deleted = 0
+        for name in names:
+            name = self._name(name)
+            if not self._is_expired(name):
+                del self._data[name]
+                deleted += 1
+        return deleted
+
+    async def sadd(self, name, *values) -> int:
+        name = self._name(name)
+        members = self._get_set(name)
+        added = {self._encode(value) for value in values} - members
+        expires_at = None if self._is_expired(name) else self._data[name][1]
+        self._data[name] = (members | added, expires_at)
+        return len(added)
+
+    async def srem(self, name, *values) -> int:
+        name = self._name(name)
+        members = self._get_set(name)
+        removed = {self._encode(value) for value in values} & members
+        if removed:
+            remaining = members - removed
+            if remaining:
+                self._data[name] = (remaining, self._data[name][1])
+            else:
+                del self._data[name]
+        return len(removed)
+
+    async def smembers(self, name) -> Set[bytes]:
+        return set(self._get_set(self._name(name)))
+
+    async def scan(self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None) -> Tuple[int, List[bytes]]:
+        # Iterate over a snapshot taken when the scan starts, so keys deleted between
+        # calls do not shift the cursor (matching Redis' SCAN guarantees).
+        if cursor == 0:
+            self._scan_id += 1
+            cursor = self._scan_id
+            self._scans[cursor] = sorted(self._data)
+        keys = self._scans.get(cursor, [])
+        batch, remaining = keys[:count or 10], keys[count or 10:]
+        if remaining:
+            self._scans[cursor] = remaining
+        else:
+            self._scans.pop(cursor, None)
+            cursor = 0
+        batch = [key for key in batch if not self._is_expired(key)]
+        if match is not None:
+            batch = [key for key in batch if fnmatch.fnmatchcase(key, match)]
+        return cursor, [key.encode("utf-8") for key in batch]
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryRedisPipeline":
+        return InMemoryRedisPipeline(self)
+
+    async def aclose(self) -> None:
+        self._data.clear()
+        self._scans.clear()
+
+
+class InMemoryRedisPipeline:
+    """Buffers commands and runs them in order on `execute`, like a redis-py pipeline."""
+
+    def __init__(self, client: InMemoryRedis):
+        self._client = client
+        self._commands: List[Tuple[str, tuple]] = []
+
+    async def __aenter__(self) -> "InMemoryRedisPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, command: str):
+        if not hasattr(self._client, command):
+            raise AttributeError(command)
+
+        def queue(*args):
+            self._commands.append((command, args))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        results = []
+        for command, args in self._commands:
+            results.append(await getattr(self._client, command)(*args))
+        self._commands.clear()
+        return results
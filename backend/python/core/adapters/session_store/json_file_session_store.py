@@ -1,16 +1,65 @@
+from core.adapters.db.record_file import lock_file_path, write_file_atomically
 from core.adapters.session_store.base_session_store import BaseSessionStore
 from core.logger import Logger
+from utils.memory_utils import estimate_dict_bytes
 from aiofile import AIOFile
-from config.constants import SESSION_STORE_JSON_FILE_PATH
+from config.constants import (SESSION_STORE_JSON_FILE_PATH, SESSION_STORE_APPEND_LOG_FILE_PATH, SESSION_STORE_DURABILITY,
+                              SESSION_STORE_FLUSH_INTERVAL_SECONDS, SESSION_STORE_SNAPSHOT_INTERVAL_SECONDS)
+import asyncio
 import json
 import os
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writes are then only serialized within one process
+    fcntl = None
 
 logger = Logger.get_logger(__name__)
 
+# Files larger than this are parsed in a worker thread so the event loop is not blocked
+OFF_LOOP_PARSE_MIN_BYTES = 64 * 1024
+
+DURABILITY_LEVELS = ("sync", "batched", "snapshot")
+
 class JsonFileSessionStore(BaseSessionStore):
-    def __init__(self):
+    """
+    Session store keeping sessions in memory, persisted to a JSON file. The username -> session IDs
+    index is only kept in memory and rebuilt from the sessions when they are loaded.
+
+    `durability` selects when changes reach disk:
+    - sync: every change rewrites the file before the call returns. Changes are applied and written under
+      an flock on the sessions lock file, after reloading the file if another process changed it, so
+      several workers can share the file without overwriting each other's changes.
+    - batched: changes are written in one coalesced rewrite at most `flush_interval_seconds` later.
+    - snapshot: every change is appended to a log; the files are rewritten as a snapshot every
+      `snapshot_interval_seconds`, after which the log is discarded. On startup the snapshot is loaded
+      and the log replayed.
+
+    With batched and snapshot the in-memory state is authoritative, so use them with a single worker.
+    Pending changes are written by `flush`, which runs on shutdown.
+    """
+
+    def __init__(self, durability: str = SESSION_STORE_DURABILITY,
+                 flush_interval_seconds: float = SESSION_STORE_FLUSH_INTERVAL_SECONDS,
+                 snapshot_interval_seconds: float = SESSION_STORE_SNAPSHOT_INTERVAL_SECONDS):
         """Initialize the JSON file session store."""
+        if durability not in DURABILITY_LEVELS:
+            logger.error(f"Unsupported SESSION_STORE_DURABILITY: {durability}")
+            raise ValueError(f"Unsupported SESSION_STORE_DURABILITY: {durability}")
+        self.durability = durability
+        self.flush_interval_seconds = flush_interval_seconds
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self._sessions: Dict[str, Dict] = {}
+        self._user_index: Dict[str, List[str]] = {}
+        self._loaded_signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._dirty = False
+        self._write_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._log_file = None
         if not os.path.exists(SESSION_STORE_JSON_FILE_PATH):
             # Create an empty session file if it doesn't exist
             with open(SESSION_STORE_JSON_FILE_PATH, 'w') as f:
@@ -18,50 +67,273 @@ class JsonFileSessionStore(BaseSessionStore):
             logger.info(f"Created session store file: {SESSION_STORE_JSON_FILE_PATH}")
 
     async def initialize(self) -> None:
-        """Initialize the session store (if needed)."""
-        logger.info("JsonFileSessionStore initialized.")
+        """Load the sessions and, in snapshot mode, open the append log and start taking snapshots."""
+        await self._load()
+        if self.durability == "snapshot":
+            self._log_file = open(SESSION_STORE_APPEND_LOG_FILE_PATH, "a")
+            self._snapshot_task = asyncio.create_task(self._snapshot_periodically())
+        logger.info(f"JsonFileSessionStore initialized with durability: {self.durability}.")
 
     async def cleanup(self) -> None:
-        """Cleanup resources (if needed)."""
+        """Write pending changes and stop background persistence."""
+        await self.flush()
+        for task in (self._flush_task, self._snapshot_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flush_task = self._snapshot_task = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
         logger.info("JsonFileSessionStore cleaned up.")
 
-    async def _read_sessions_from_file(self) -> Dict:
-        """Read sessions from the JSON file."""
-        logger.debug(f"Reading sessions from file: {SESSION_STORE_JSON_FILE_PATH}")
+    async def warm_up(self) -> None:
+        """Make sure the sessions are loaded before traffic arrives."""
+        await self._ensure_loaded()
+
+    async def flush(self) -> None:
+        """Write all changes that are not on disk yet."""
+        if self.durability == "snapshot" and self._log_file is not None:
+            await self._take_snapshot()
+        elif self._dirty:
+            await self._write_files()
+
+    async def _read_sessions_from_file(self, file_path: str = SESSION_STORE_JSON_FILE_PATH) -> Dict:
+        """Read sessions from a JSON file."""
+        logger.debug(f"Reading sessions from file: {file_path}")
         try:
-            if not os.path.exists(SESSION_STORE_JSON_FILE_PATH):
-                logger.warning(f"Session store file does not exist: {SESSION_STORE_JSON_FILE_PATH}")
+            if not os.path.exists(file_path):
+                logger.warning(f"Session store file does not exist: {file_path}")
                 return {}
-            async with AIOFile(SESSION_STORE_JSON_FILE_PATH, 'r') as afp:
+            async with AIOFile(file_path, 'r') as afp:
                 content = await afp.read()
-                return json.loads(content) if content else {}
+            if not content:
+                return {}
+            if len(content) >= OFF_LOOP_PARSE_MIN_BYTES:
+                return await asyncio.to_thread(json.loads, content)
+            return json.loads(content)
         except FileNotFoundError:
-            logger.warning(f"Session store file not found: {SESSION_STORE_JSON_FILE_PATH}")
+            logger.warning(f"Session store file not found: {file_path}")
             return {}
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON from session store file: {SESSION_STORE_JSON_FILE_PATH}. Error: {e}")
+            logger.error(f"Failed to decode JSON from session store file: {file_path}. Error: {e}")
             return {}
         except Exception as e:
-            logger.error(f"Unexpected error while reading session store file: {SESSION_STORE_JSON_FILE_PATH}. Error: {e}")
+            logger.error(f"Unexpected error while reading session store file: {file_path}. Error: {e}")
             return {}
 
-    async def _write_sessions_to_file(self, sessions: Dict) -> None:
-        """Write sessions to the JSON file."""
-        logger.debug(f"Writing sessions to file: {SESSION_STORE_JSON_FILE_PATH}")
+    async def _write_sessions_to_file(self, sessions: Dict, file_path: str = SESSION_STORE_JSON_FILE_PATH) -> None:
+        """
+        Write sessions to a JSON file, atomically replacing the previous file. The
+        content is fsynced first, through a temporary file unique to this write, so concurrent writers
+        (other workers included) never share or truncate each other's temporary file.
+        """
+        logger.debug(f"Writing sessions to file: {file_path}")
         try:
-            async with AIOFile(SESSION_STORE_JSON_FILE_PATH, 'w') as afp:
-                await afp.write(json.dumps(sessions, indent=4))
+            await asyncio.to_thread(write_file_atomically, file_path, json.dumps(sessions, indent=4))
         except Exception as e:
-            logger.error(f"Failed to write sessions to file: {SESSION_STORE_JSON_FILE_PATH}. Error: {e}")
+            logger.error(f"Failed to write sessions to file: {file_path}. Error: {e}")
             raise
 
+    @staticmethod
+    def _file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def _load(self) -> None:
+        """Load the sessions file (and in snapshot mode replay the append logs) into memory."""
+        signature = self._file_signature(SESSION_STORE_JSON_FILE_PATH)
+        self._sessions = {}
+        self._user_index = {}
+        self._apply({"op": "load", "sessions": await self._read_sessions_from_file()})
+        if self.durability == "snapshot":
+            # A rotated log is left behind if the app stopped while a snapshot was being written
+            for log_path in (SESSION_STORE_APPEND_LOG_FILE_PATH + ".1", SESSION_STORE_APPEND_LOG_FILE_PATH):
+                replayed = self._replay_log(log_path)
+                if replayed:
+                    logger.info(f"Replayed {replayed} session changes from log: {log_path}")
+                    self._dirty = True
+        self._loaded_signature = signature
+        self._loaded = True
+
+    def _replay_log(self, log_path: str) -> int:
+        replayed = 0
+        try:
+            with open(log_path, "r") as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-append
+                        logger.warning(f"Skipping unreadable line in session log: {log_path}")
+                        continue
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return replayed
+
+    async def _ensure_loaded(self) -> None:
+        """Load the sessions if needed; in sync mode also reload them if another process changed the file."""
+        if not self._loaded:
+            await self._load()
+        elif (self.durability == "sync" and not self._dirty and not self._write_lock.locked()
+              and self._file_signature(SESSION_STORE_JSON_FILE_PATH) != self._loaded_signature):
+            # Never reload over changes of this process that are not written yet
+            await self._load()
+
+    def _apply(self, change: Dict) -> int:
+        """
+        Apply a change to the in-memory sessions and user index. Changes are idempotent, so logs can be
+        replayed. Returns the number of sessions deleted.
+        """
+        if change["op"] == "delete_user":
+            # Resolved when applied, so sessions of the user created by other processes are included
+            return self._apply({"op": "delete", "session_ids": list(self._user_index.get(change["username"], []))})
+        if change["op"] == "load":
+            for session_id, data in change["sessions"].items():
+                self._apply({"op": "create", "session_id": session_id, "data": data})
+        elif change["op"] == "create":
+            session_id, data = change["session_id"], change["data"]
+            self._sessions[session_id] = data
+            username = data.get("username")
+            if username:
+                session_ids = self._user_index.setdefault(username, [])
+                if session_id not in session_ids:
+                    session_ids.append(session_id)
+        elif change["op"] == "delete":
+            deleted = 0
+            for session_id in change["session_ids"]:
+                data = self._sessions.pop(session_id, None)
+                deleted += data is not None
+                username = data.get("username") if data else None
+                if username and session_id in self._user_index.get(username, []):
+                    self._user_index[username].remove(session_id)
+                    if not self._user_index[username]:
+                        del self._user_index[username]
+            return deleted
+        elif change["op"] == "clear":
+            self._sessions = {}
+            self._user_index = {}
+        return 0
+
+    async def _record(self, change: Dict) -> int:
+        """
+        Apply a change in memory and persist it according to the durability level. Returns the number
+        of sessions deleted.
+        """
+        if self.durability == "sync":
+            return await self._write_files(change)
+        deleted = self._apply(change)
+        self._dirty = True
+        if self.durability == "batched":
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_later())
+        else:
+            # Appending one line is cheap (no fsync); the file is rewritten only by snapshots
+            self._log_file.write(json.dumps(change, separators=(",", ":")) + "\n")
+            self._log_file.flush()
+        return deleted
+
+    @staticmethod
+    def _lock_sessions_file():
+        """Take the cross-process lock of the sessions file (blocking; call it from a worker thread). Returns the open lock file."""
+        lock_file = open(lock_file_path(SESSION_STORE_JSON_FILE_PATH), "a+b")
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        return lock_file
+
+    @staticmethod
+    def _unlock_sessions_file(lock_file) -> None:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        lock_file.close()
+
+    async def _write_files(self, change: Optional[Dict] = None) -> int:
+        """
+        Rewrite the sessions file from memory under the file's cross-process lock. In sync mode the file
+        is first reloaded if another process changed it, then `change` is applied, so the write starts
+        from the latest sessions. Returns the number of sessions the change deleted.
+        """
+        async with self._write_lock:
+            lock_file = await asyncio.to_thread(self._lock_sessions_file)
+            try:
+                if (self.durability == "sync"
+                        and self._file_signature(SESSION_STORE_JSON_FILE_PATH) != self._loaded_signature):
+                    await self._load()
+                deleted = self._apply(change) if change is not None else 0
+                if change is not None and change["op"] in ("delete", "delete_user") and not deleted and not self._dirty:
+                    return 0
+                self._dirty = False
+                sessions = dict(self._sessions)
+                try:
+                    await self._write_sessions_to_file(sessions)
+                except Exception:
+                    self._dirty = True
+                    raise
+                self._loaded_signature = self._file_signature(SESSION_STORE_JSON_FILE_PATH)
+                return deleted
+            finally:
+                self._unlock_sessions_file(lock_file)
+
+    async def _flush_later(self) -> None:
+        # Changes made while the files are being written mark the store dirty again without scheduling
+        # another flush (this task is still running), so keep flushing until nothing is left
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self._write_files()
+            except Exception as e:
+                logger.error(f"Failed to flush sessions. Error: {e}")
+            if not self._dirty:
+                return
+
+    async def _take_snapshot(self) -> None:
+        """Write the in-memory state as a snapshot and discard the log entries it contains."""
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            # Rotate the log first, so changes made while the snapshot is written land in the new log
+            self._log_file.close()
+            rotated_log_path = SESSION_STORE_APPEND_LOG_FILE_PATH + ".1"
+            if os.path.exists(rotated_log_path):
+                # Left over from a failed snapshot: keep its entries, they are not in any snapshot yet
+                with open(SESSION_STORE_APPEND_LOG_FILE_PATH, "r") as log, open(rotated_log_path, "a") as rotated:
+                    rotated.write(log.read())
+                os.remove(SESSION_STORE_APPEND_LOG_FILE_PATH)
+            else:
+                os.replace(SESSION_STORE_APPEND_LOG_FILE_PATH, rotated_log_path)
+            self._log_file = open(SESSION_STORE_APPEND_LOG_FILE_PATH, "a")
+            self._dirty = False
+            sessions = dict(self._sessions)
+            try:
+                await self._write_sessions_to_file(sessions)
+            except Exception:
+                # The rotated log is kept and replayed on startup; retry with the next snapshot
+                self._dirty = True
+                raise
+            os.remove(rotated_log_path)
+            logger.info(f"Wrote session snapshot with {len(sessions)} sessions.")
+
+    async def _snapshot_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval_seconds)
+            try:
+                await self._take_snapshot()
+            except Exception as e:
+                logger.error(f"Failed to write session snapshot. Error: {e}")
+
     async def create_session(self, session_id: str, data: Dict) -> None:
         """Create a new session."""
         logger.debug(f"Creating session with ID: {session_id}")
         try:
-            existing_sessions = await self._read_sessions_from_file()
-            existing_sessions[session_id] = data
-            await self._write_sessions_to_file(existing_sessions)
+            await self._ensure_loaded()
+            await self._record({"op": "create", "session_id": session_id, "data": data})
             logger.info(f"Session created successfully with ID: {session_id}")
         except Exception as e:
             logger.error(f"Failed to create session with ID: {session_id}. Error: {e}")
@@ -71,8 +343,8 @@ class JsonFileSessionStore(BaseSessionStore):
         """Retrieve a session by its ID."""
         logger.debug(f"Retrieving session with ID: {session_id}")
         try:
-            existing_sessions = await self._read_sessions_from_file()
-            session = existing_sessions.get(session_id)
+            await self._ensure_loaded()
+            session = self._sessions.get(session_id)
             if session:
                 logger.info(f"Session retrieved successfully with ID: {session_id}")
             else:
@@ -86,10 +358,9 @@ class JsonFileSessionStore(BaseSessionStore):
         """Delete a session by its ID."""
         logger.debug(f"Deleting session with ID: {session_id}")
         try:
-            existing_sessions = await self._read_sessions_from_file()
-            if session_id in existing_sessions:
-                del existing_sessions[session_id]
-                await self._write_sessions_to_file(existing_sessions)
+            await self._ensure_loaded()
+            if session_id in self._sessions:
+                await self._record({"op": "delete", "session_ids": [session_id]})
                 logger.info(f"Session deleted successfully with ID: {session_id}")
             else:
                 logger.warning(f"Session with ID: {session_id} not found")
@@ -97,12 +368,52 @@ class JsonFileSessionStore(BaseSessionStore):
             logger.error(f"Failed to delete session with ID: {session_id}. Error: {e}")
             raise
 
+    async def list_sessions_for_user(self, username: str) -> List[str]:
+        """List the session IDs of a user from the user index."""
+        logger.debug(f"Listing sessions for username: {username}")
+        try:
+            await self._ensure_loaded()
+            return list(self._user_index.get(username, []))
+        except Exception as e:
+            logger.error(f"Failed to list sessions for username: {username}. Error: {e}")
+            raise
+
+    async def delete_sessions_for_user(self, username: str) -> int:
+        """Delete all sessions of a user."""
+        logger.debug(f"Deleting all sessions for username: {username}")
+        try:
+            if not await self.list_sessions_for_user(username) and self.durability != "sync":
+                logger.info(f"No sessions found for username: {username}")
+                return 0
+            # In sync mode the sessions are looked up again under the file lock, as another worker may
+            # have created one since this process last loaded the file
+            deleted = await self._record({"op": "delete_user", "username": username})
+            logger.info(f"Deleted {deleted} sessions for username: {username}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete sessions for username: {username}. Error: {e}")
+            raise
+
     async def clear_sessions(self) -> None:
         """Clear all sessions."""
         logger.debug("Clearing all sessions")
         try:
-            await self._write_sessions_to_file({})
+            await self._ensure_loaded()
+            await self._record({"op": "clear"})
             logger.info("All sessions cleared successfully")
         except Exception as e:
             logger.error(f"Failed to clear all sessions. Error: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def memory_usage(self) -> Dict:
+        """
+        Number of sessions held in memory, how many of them have expired, and the estimated size of the
+        sessions and the user index. Expired sessions are only dropped when deleted, so a growing
+        expired count means they are piling up.
+        """
+        now = time.time()
+        expired = sum(1 for data in self._sessions.values()
+                      if isinstance(data.get("expires_at"), (int, float)) and data["expires_at"] <= now)
+        return {"sessions": len(self._sessions), "expired_sessions": expired, "users": len(self._user_index),
+                "sessions_bytes": estimate_dict_bytes(self._sessions),
+                "user_index_bytes": estimate_dict_bytes(self._user_index)}
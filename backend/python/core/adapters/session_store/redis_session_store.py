@@ -0,0 +1,203 @@
+from core.adapters.session_store.base_session_store import BaseSessionStore
+from core.adapters.session_store.in_memory_redis import InMemoryRedis
+from core.logger import Logger
+from config.constants import (SESSION_STORE_REDIS_URL, SESSION_STORE_REDIS_MAX_CONNECTIONS,
+                              SESSION_STORE_REDIS_KEY_PREFIX, SESSION_STORE_REDIS_USER_INDEX_PREFIX,
+                              SESSION_EXPIRY_SECONDS)
+import json
+import math
+import time
+from typing import Dict, List, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only required when SESSION_STORE_TYPE=redis
+    aioredis = None
+
+logger = Logger.get_logger(__name__)
+
+SCAN_BATCH_SIZE = 500
+
+class RedisSessionStore(BaseSessionStore):
+    def __init__(self, url: str = SESSION_STORE_REDIS_URL, max_connections: int = SESSION_STORE_REDIS_MAX_CONNECTIONS,
+                 key_prefix: str = SESSION_STORE_REDIS_KEY_PREFIX,
+                 user_index_prefix: str = SESSION_STORE_REDIS_USER_INDEX_PREFIX):
+        """Initialize the Redis session store."""
+        self.url = url
+        self.max_connections = max_connections
+        self.key_prefix = key_prefix
+        self.user_index_prefix = user_index_prefix
+        self._pool = None
+        self._client = None
+
+    async def initialize(self) -> None:
+        """Create the connection pool and verify the server is reachable."""
+        if self.url.startswith("memory://"):
+            logger.info("Using in-process InMemoryRedis for RedisSessionStore.")
+            self._client = InMemoryRedis()
+        else:
+            if aioredis is None:
+                logger.error("The 'redis' package is required for SESSION_STORE_TYPE=redis.")
+                raise RuntimeError("The 'redis' package is required for SESSION_STORE_TYPE=redis.")
+            self._pool = aioredis.ConnectionPool.from_url(self.url, max_connections=self.max_connections)
+            self._client = aioredis.Redis(connection_pool=self._pool)
+        await self._client.ping()
+        logger.info(f"RedisSessionStore initialized with max_connections: {self.max_connections}.")
+
+    async def cleanup(self) -> None:
+        """Close the client and release pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._pool is not None:
+            await self._pool.disconnect()
+            self._pool = None
+        logger.info("RedisSessionStore cleaned up.")
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def _user_index_key(self, username: str) -> str:
+        return f"{self.user_index_prefix}{username}"
+
+    @staticmethod
+    def _encode_session(data: Dict) -> bytes:
+        """Encode session data compactly (no indentation or whitespace)."""
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _decode_session(raw: bytes) -> Dict:
+        return json.loads(raw)
+
+    @staticmethod
+    def _get_ttl_seconds(data: Dict) -> int:
+        """Derive the native key TTL from the session's expires_at timestamp."""
+        expires_at = data.get("expires_at")
+        if not expires_at:
+            return SESSION_EXPIRY_SECONDS
+        return max(1, math.ceil(expires_at - time.time()))
+
+    async def create_session(self, session_id: str, data: Dict) -> None:
+        """Create a new session."""
+        logger.debug(f"Creating session with ID: {session_id}")
+        try:
+            ttl_seconds = self._get_ttl_seconds(data)
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.setex(self._key(session_id), ttl_seconds, self._encode_session(data))
+                if data.get("username"):
+                    # The index set outlives every session it points to; stale members are pruned on read.
+                    pipe.sadd(self._user_index_key(data["username"]), session_id)
+                    pipe.expire(self._user_index_key(data["username"]), max(ttl_seconds, SESSION_EXPIRY_SECONDS))
+                await pipe.execute()
+            logger.info(f"Session created successfully with ID: {session_id}")
+        except Exception as e:
+            logger.error(f"Failed to create session with ID: {session_id}. Error: {e}")
+            raise
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        """Retrieve a session by its ID."""
+        logger.debug(f"Retrieving session with ID: {session_id}")
+        try:
+            raw = await self._client.get(self._key(session_id))
+            if raw is None:
+                logger.warning(f"Session with ID: {session_id} not found")
+                return None
+            logger.info(f"Session retrieved successfully with ID: {session_id}")
+            return self._decode_session(raw)
+        except Exception as e:
+            logger.error(f"Failed to retrieve session with ID: {session_id}. Error: {e}")
+            raise
+
+    async def delete_session(self, session_id: str) -> None:
+        """Delete a session by its ID."""
+        logger.debug(f"Deleting session with ID: {session_id}")
+        try:
+            raw = await self._client.get(self._key(session_id))
+            if raw is None:
+                logger.warning(f"Session with ID: {session_id} not found")
+                return
+            username = self._decode_session(raw).get("username")
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.delete(self._key(session_id))
+                if username:
+                    pipe.srem(self._user_index_key(username), session_id)
+                deleted, *_ = await pipe.execute()
+            if deleted:
+                logger.info(f"Session deleted successfully with ID: {session_id}")
+            else:
+                logger.warning(f"Session with ID: {session_id} not found")
+        except Exception as e:
+            logger.error(f"Failed to delete session with ID: {session_id}. Error: {e}")
+            raise
+
+    async def list_sessions_for_user(self, username: str) -> List[str]:
+        """List the session IDs of a user, pruning index members whose session key has expired."""
+        logger.debug(f"Listing sessions for username: {username}")
+        try:
+            members = [m.decode("utf-8") if isinstance(m, bytes) else m
+                       for m in await self._client.smembers(self._user_index_key(username))]
+            if not members:
+                return []
+            async with self._client.pipeline(transaction=False) as pipe:
+                for session_id in members:
+                    pipe.exists(self._key(session_id))
+                exists = await pipe.execute()
+            live = [session_id for session_id, found in zip(members, exists) if found]
+            stale = [session_id for session_id, found in zip(members, exists) if not found]
+            if stale:
+                await self._client.srem(self._user_index_key(username), *stale)
+            return live
+        except Exception as e:
+            logger.error(f"Failed to list sessions for username: {username}. Error: {e}")
+            raise
+
+    async def delete_sessions_for_user(self, username: str) -> int:
+        """
+        Delete all sessions of a user and their index entries in one pipeline. Only the index members that
+        were read are removed (not the whole set), so a session created meanwhile stays indexed and a
+        later revocation still finds it.
+        """
+        logger.debug(f"Deleting all sessions for username: {username}")
+        try:
+            session_ids = [m.decode("utf-8") if isinstance(m, bytes) else m
+                           for m in await self._client.smembers(self._user_index_key(username))]
+            if not session_ids:
+                logger.info(f"No sessions found for username: {username}")
+                return 0
+            async with self._client.pipeline(transaction=False) as pipe:
+                for session_id in session_ids:
+                    pipe.delete(self._key(session_id))
+                pipe.srem(self._user_index_key(username), *session_ids)
+                results = await pipe.execute()
+            deleted = sum(results[:-1])
+            logger.info(f"Deleted {deleted} sessions for username: {username}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete sessions for username: {username}. Error: {e}")
+            raise
+
+    async def _delete_keys_matching(self, prefix: str) -> int:
+        """Scan the key space for a prefix in batches and delete each batch in one pipeline."""
+        cursor = 0
+        deleted = 0
+        while True:
+            cursor, keys = await self._client.scan(cursor=cursor, match=f"{prefix}*", count=SCAN_BATCH_SIZE)
+            if keys:
+                async with self._client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.delete(key)
+                    results = await pipe.execute()
+                deleted += sum(results)
+            if cursor == 0:
+                return deleted
+
+    async def clear_sessions(self) -> None:
+        """Clear all sessions and user index entries."""
+        logger.debug("Clearing all sessions")
+        try:
+            deleted = await self._delete_keys_matching(self.key_prefix)
+            await self._delete_keys_matching(self.user_index_prefix)
+            logger.info(f"All sessions cleared successfully. Deleted: {deleted}")
+        except Exception as e:
+            logger.error(f"Failed to clear all sessions. Error: {e}")
+            raise
@@ -0,0 +1,402 @@
+from core.adapters.session_store.base_session_store import BaseSessionStore
+from core.logger import Logger
+from config.constants import BUILT_IN_ROLES, SESSION_EXPIRY_SECONDS
+from multiprocessing import resource_tracker, shared_memory
+from contextlib import contextmanager
+import asyncio
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writers are then only serialized within one process
+    fcntl = None
+
+logger = Logger.get_logger(__name__)
+
+# Header: magic, slot count
+_HEADER = struct.Struct("<4sI")
+_HEADER_SIZE = 64
+_MAGIC = b"SST1"
+# Slot: sequence, state, role index, session ID length, username length, expires_at, session ID, username
+_SLOT = struct.Struct("<IBBBBd32s32s")
+_SEQUENCE = struct.Struct("<I")
+_MAX_KEY_BYTES = 32
+
+_EMPTY = 0
+_LIVE = 1
+_DELETED = 2
+
+# Slots probed from the home slot of a session ID before giving up (reads) or evicting (writes)
+MAX_PROBES = 16
+# Times a reader retries a slot that is being written before treating the lookup as a miss
+MAX_READ_RETRIES = 64
+
+_SESSION_FIELDS = frozenset(("username", "role", "expires_at"))
+
+# (username, role, expires_at) of a live session, or None if the session is known to be deleted
+SharedSessionEntry = Optional[Tuple[str, str, float]]
+
+
+@contextmanager
+def _untracked():
+    """
+    Keep shared memory segments out of this process's resource tracker, which would otherwise unlink
+    them when this process exits even though other workers are still using them. The launcher, which
+    creates the table, unlinks it instead.
+    """
+    register, unregister = resource_tracker.register, resource_tracker.unregister
+    resource_tracker.register = resource_tracker.unregister = lambda name, rtype: None
+    try:
+        yield
+    finally:
+        resource_tracker.register, resource_tracker.unregister = register, unregister
+
+
+def _open_shared_memory(name: str, create: bool, size: int = 0) -> shared_memory.SharedMemory:
+    with _untracked():
+        return shared_memory.SharedMemory(name=name, create=create, size=size)
+
+
+def _unlink_shared_memory(shm: shared_memory.SharedMemory) -> None:
+    with _untracked():
+        shm.unlink()
+
+
+class SharedSessionTable:
+    """
+    Fixed-size open-addressing hash table of session_id -> (username, role, expires_at) in a
+    `multiprocessing.shared_memory` segment, shared by all workers on a host.
+
+    Each slot has its own sequence counter (a seqlock): a writer makes it odd, writes the slot and
+    makes it even again, and a reader retries while the counter is odd or changed during its read, so
+    reads take no lock. Writers are serialized across processes with an flock on a lock file (and
+    across threads of a process with a lock, as flock does not exclude them). Roles are stored as an
+    index into BUILT_IN_ROLES. Deleted sessions leave a tombstone with their ID until the session would
+    have expired, so a lookup racing with the delete cannot put the session back.
+
+    Only the launcher creates and removes the table; workers attach to it and detach, so they all
+    share one table whatever order they start and stop in. Writes block on the lock, so call put,
+    delete and clear from a worker thread.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self._shm = shm
+        self.name = shm.name
+        magic, self.slot_count = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC or self.slot_count == 0 or self.slot_count & (self.slot_count - 1):
+            raise RuntimeError(f"Shared memory segment '{self.name}' is not a session table.")
+        self._mask = self.slot_count - 1
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{self.name}.lock"), "a+b")
+        self._thread_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, name: str, slot_count: int) -> "SharedSessionTable":
+        """
+        Create the table (slot_count is rounded up to a power of two). Called by the launcher before
+        it starts the workers. A table left behind by a launcher that did not exit cleanly is cleared
+        and reused; a segment of the same name that is not a session table raises RuntimeError.
+        """
+        slot_count = 1 << max(0, slot_count - 1).bit_length()
+        size = _HEADER_SIZE + slot_count * _SLOT.size
+        try:
+            shm = _open_shared_memory(name, create=True, size=size)
+        except FileExistsError:
+            table = cls.attach(name)
+            logger.warning(f"Reusing shared session table left by a previous run: {name} "
+                           f"with {table.slot_count} slots; clearing it.")
+            table.clear()
+            return table
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, slot_count)
+        logger.info(f"Created shared session table: {name} with {slot_count} slots ({size} bytes).")
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedSessionTable":
+        """
+        Attach to a table created by the launcher. Raises FileNotFoundError if there is none and
+        RuntimeError if the segment is not a session table.
+        """
+        shm = _open_shared_memory(name, create=False)
+        try:
+            table = cls(shm)
+        except RuntimeError:
+            shm.close()
+            raise
+        logger.info(f"Attached to shared session table: {name} with {table.slot_count} slots.")
+        return table
+
+    def close(self) -> None:
+        """Detach from the table. The table itself stays until the launcher unlinks it."""
+        self._lock_file.close()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Remove the table. Only the launcher calls this, once all workers have stopped."""
+        _unlink_shared_memory(self._shm)
+
+    def _probe(self, key: bytes):
+        home = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+        for i in range(min(MAX_PROBES, self.slot_count)):
+            yield _HEADER_SIZE + ((home + i) & self._mask) * _SLOT.size
+
+    def _read_slot(self, offset: int) -> Optional[tuple]:
+        """Consistent copy of a slot, or None if writers kept changing it."""
+        buf = self._shm.buf
+        for _ in range(MAX_READ_RETRIES):
+            sequence = _SEQUENCE.unpack_from(buf, offset)[0]
+            if sequence & 1:
+                continue
+            slot = _SLOT.unpack_from(buf, offset)
+            if _SEQUENCE.unpack_from(buf, offset)[0] == sequence:
+                return slot
+        return None
+
+    def _write_slot(self, offset: int, state: int, role_index: int, key: bytes, username: bytes,
+                    expires_at: float) -> None:
+        buf = self._shm.buf
+        sequence = _SEQUENCE.unpack_from(buf, offset)[0]
+        _SEQUENCE.pack_into(buf, offset, (sequence + 1) & 0xFFFFFFFF)
+        _SLOT.pack_into(buf, offset, (sequence + 1) & 0xFFFFFFFF, state, role_index, len(key), len(username),
+                        expires_at, key, username)
+        _SEQUENCE.pack_into(buf, offset, (sequence + 2) & 0xFFFFFFFF)
+
+    def _lock(self) -> None:
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    @staticmethod
+    def _key(session_id: str) -> Optional[bytes]:
+        key = session_id.encode("utf-8")
+        return key if 0 < len(key) <= _MAX_KEY_BYTES else None
+
+    def get(self, session_id: str) -> Tuple[bool, SharedSessionEntry]:
+        """Look up a session without locking. Returns (found, entry); entry is None for a deleted session."""
+        key = self._key(session_id)
+        if key is None:
+            return False, None
+        for offset in self._probe(key):
+            slot = self._read_slot(offset)
+            if slot is None:
+                return False, None
+            _, state, role_index, key_length, username_length, expires_at, slot_key, username = slot
+            if state == _EMPTY:
+                return False, None
+            if slot_key[:key_length] != key:
+                continue
+            if state == _DELETED:
+                return True, None
+            return True, (username[:username_length].decode("utf-8"), BUILT_IN_ROLES[role_index], expires_at)
+        return False, None
+
+    def put(self, session_id: str, username: str, role: str, expires_at: float, replace_deleted: bool = True) -> bool:
+        """
+        Store a session. With replace_deleted=False (filling the table after a miss) a tombstone of the
+        same session is kept. Returns False if the session cannot be stored in the table.
+        """
+        key = self._key(session_id)
+        username_bytes = username.encode("utf-8")
+        if key is None or len(username_bytes) > _MAX_KEY_BYTES or role not in BUILT_IN_ROLES:
+            return False
+        return self._store(key, _LIVE, BUILT_IN_ROLES.index(role), username_bytes, expires_at, replace_deleted)
+
+    def delete(self, session_id: str, expires_at: float) -> None:
+        """
+        Replace a session by a tombstone kept until expires_at, which must not be earlier than the
+        session's own expiry (also when it is not in the table, so a racing fill cannot add it).
+        """
+        key = self._key(session_id)
+        if key is not None:
+            self._store(key, _DELETED, 0, b"", expires_at, replace_deleted=True)
+
+    def _store(self, key: bytes, state: int, role_index: int, username: bytes, expires_at: float,
+               replace_deleted: bool) -> bool:
+        now = time.time()
+        self._lock()
+        try:
+            target = None
+            # Slot to evict if the probe sequence has no free slot: the live session expiring first,
+            # or for a tombstone, whichever slot expires first
+            victim, victim_expires_at = None, None
+            for offset in self._probe(key):
+                _, slot_state, _, key_length, _, slot_expires_at, slot_key, _ = _SLOT.unpack_from(self._shm.buf, offset)
+                if slot_state != _EMPTY and slot_key[:key_length] == key:
+                    if slot_state == _DELETED and not replace_deleted:
+                        return False
+                    target = offset
+                    break
+                # Other sessions' tombstones are only reused once they have expired
+                if target is None and (slot_state == _EMPTY or slot_expires_at <= now):
+                    target = offset
+                if slot_state == _EMPTY:
+                    break
+                if ((slot_state == _LIVE or state == _DELETED)
+                        and (victim is None or slot_expires_at < victim_expires_at)):
+                    victim, victim_expires_at = offset, slot_expires_at
+            if target is None:
+                if victim is None:
+                    # Probe sequence is full of tombstones that are still needed
+                    return False
+                target = victim
+            self._write_slot(target, state, role_index, key, username, expires_at)
+            return True
+        finally:
+            self._unlock()
+
+    def occupancy(self) -> Dict:
+        """Slots by state (live, expired, deleted), read without locking, and the size of the segment."""
+        now = time.time()
+        live = expired = deleted = 0
+        buf = self._shm.buf
+        for slot in range(self.slot_count):
+            state = buf[_HEADER_SIZE + slot * _SLOT.size + 4]
+            if state == _LIVE:
+                if _SLOT.unpack_from(buf, _HEADER_SIZE + slot * _SLOT.size)[5] <= now:
+                    expired += 1
+                else:
+                    live += 1
+            elif state == _DELETED:
+                deleted += 1
+        return {"slots": self.slot_count, "live": live, "expired": expired, "deleted": deleted,
+                "bytes": _HEADER_SIZE + self.slot_count * _SLOT.size}
+
+    def clear(self) -> None:
+        """Empty every slot."""
+        self._lock()
+        try:
+            for slot in range(self.slot_count):
+                offset = _HEADER_SIZE + slot * _SLOT.size
+                if self._shm.buf[offset + 4] != _EMPTY:
+                    self._write_slot(offset, _EMPTY, 0, b"", b"", 0.0)
+        finally:
+            self._unlock()
+
+
+class SharedMemorySessionStore(BaseSessionStore):
+    """
+    Session store decorator that puts a SharedSessionTable in front of any backend.
+
+    Lookups are answered from the shared table, which every worker on the host reads without locking
+    and without a round trip to the backend; misses go to the backend and fill the table. Creates,
+    deletes and clears go to the backend and then to the table, so a logout in one worker is seen by
+    all of them at once. Only sessions made of username, a built-in role and expires_at are cached.
+
+    The table is attached by name. The launcher (serve.py) creates it before starting the workers and
+    removes it after they have stopped, so it outlives worker restarts; without it the store refuses to
+    start rather than create a table of its own that other workers would not see. Writes to the table
+    run in a worker thread, as they wait for the table's lock.
+    """
+
+    def __init__(self, backend: BaseSessionStore, table_name: str, slot_count: int):
+        """Initialize the shared memory session store."""
+        self.backend = backend
+        self.table_name = table_name
+        self.slot_count = slot_count
+        self.table: Optional[SharedSessionTable] = None
+        self.hits = 0
+        self.misses = 0
+
+    async def initialize(self) -> None:
+        """Initialize the wrapped backend and attach to the shared table created by the launcher."""
+        await self.backend.initialize()
+        try:
+            self.table = SharedSessionTable.attach(self.table_name)
+        except FileNotFoundError:
+            logger.error(f"Shared session table does not exist: {self.table_name}")
+            raise RuntimeError(f"Shared session table '{self.table_name}' does not exist. It is created by serve.py "
+                               f"before the workers start; run the app with serve.py or set "
+                               f"SESSION_SHARED_CACHE_ENABLED=false.")
+        logger.info(f"SharedMemorySessionStore initialized with table: {self.table_name}.")
+
+    async def cleanup(self) -> None:
+        """Detach from the shared table and cleanup the wrapped backend."""
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+        await self.backend.cleanup()
+        logger.info("SharedMemorySessionStore cleaned up.")
+
+    async def warm_up(self) -> None:
+        """Warm up the wrapped backend."""
+        await self.backend.warm_up()
+
+    async def flush(self) -> None:
+        """Flush the wrapped backend."""
+        await self.backend.flush()
+
+    async def _fill(self, session_id: str, data: Dict, replace_deleted: bool) -> None:
+        if set(data) != _SESSION_FIELDS or not isinstance(data.get("expires_at"), (int, float)):
+            return
+        if not await asyncio.to_thread(self.table.put, session_id, data["username"], data["role"],
+                                       data["expires_at"], replace_deleted):
+            logger.debug(f"Session with ID: {session_id} not stored in the shared session table.")
+
+    async def _delete_from_table(self, session_ids: List[str]) -> None:
+        # A session never lives longer than SESSION_EXPIRY_SECONDS from now, so neither does its tombstone
+        expires_at = time.time() + SESSION_EXPIRY_SECONDS
+
+        def delete_all():
+            for session_id in session_ids:
+                self.table.delete(session_id, expires_at)
+
+        await asyncio.to_thread(delete_all)
+
+    async def create_session(self, session_id: str, data: Dict) -> None:
+        """Create a new session in the backend and the shared table."""
+        await self.backend.create_session(session_id, data)
+        await self._fill(session_id, data, replace_deleted=True)
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        """Retrieve a session by its ID, consulting the shared table first."""
+        found, entry = self.table.get(session_id)
+        if found:
+            self.hits += 1
+            logger.debug(f"Shared session table hit for ID: {session_id}")
+            if entry is None:
+                return None
+            username, role, expires_at = entry
+            return {"username": username, "role": role, "expires_at": expires_at}
+
+        self.misses += 1
+        logger.debug(f"Shared session table miss for ID: {session_id}")
+        session = await self.backend.get_session(session_id)
+        if session is not None:
+            await self._fill(session_id, session, replace_deleted=False)
+        return session
+
+    async def delete_session(self, session_id: str) -> None:
+        """Delete a session from the backend and leave a tombstone in the shared table."""
+        await self.backend.delete_session(session_id)
+        await self._delete_from_table([session_id])
+
+    async def list_sessions_for_user(self, username: str) -> List[str]:
+        """List the session IDs of a user from the backend's index."""
+        return await self.backend.list_sessions_for_user(username)
+
+    async def delete_sessions_for_user(self, username: str) -> int:
+        """Delete all sessions of a user from the backend and the shared table."""
+        session_ids = await self.backend.list_sessions_for_user(username)
+        deleted = await self.backend.delete_sessions_for_user(username)
+        await self._delete_from_table(session_ids)
+        return deleted
+
+    async def clear_sessions(self) -> None:
+        """Clear all sessions from the backend and the shared table."""
+        await self.backend.clear_sessions()
+        await asyncio.to_thread(self.table.clear)
+
+    def memory_usage(self) -> Dict:
+        """Occupancy of the shared table (shared by every worker on the host) and the wrapped backend's usage."""
+        return {"shared_table": self.table.occupancy() if self.table is not None else {},
+                "backend": self.backend.memory_usage()}
@@ -0,0 +1,178 @@
+from core.adapters.session_store.base_session_store import BaseSessionStore
+from core.logger import Logger
+from config.constants import SESSION_STORE_SQLITE_PATH, SESSION_STORE_SQLITE_PURGE_INTERVAL_SECONDS
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+logger = Logger.get_logger(__name__)
+
+T = TypeVar("T")
+
+SCHEMA_STATEMENTS = (
+    """CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        username TEXT,
+        expires_at REAL,
+        data TEXT NOT NULL
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)",
+    "CREATE INDEX IF NOT EXISTS sessions_username ON sessions (username)",
+)
+
+class SqliteSessionStore(BaseSessionStore):
+    """
+    Session store backed by a SQLite database file.
+
+    Sessions are rows keyed by session_id, with indexes on expires_at (so expired sessions are purged
+    with a single ranged DELETE) and on username (the user -> sessions index). The database runs in WAL
+    mode, so uvicorn workers sharing the file read concurrently while one of them writes. All queries
+    run on one dedicated thread that owns the connection, so the event loop never blocks on disk I/O.
+    """
+
+    def __init__(self, db_path: str = SESSION_STORE_SQLITE_PATH,
+                 purge_interval_seconds: float = SESSION_STORE_SQLITE_PURGE_INTERVAL_SECONDS):
+        """Initialize the SQLite session store."""
+        self.db_path = db_path
+        self.purge_interval_seconds = purge_interval_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._purge_task: Optional[asyncio.Task] = None
+
+    async def _run(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """Run func(connection) on the store's database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, self._connection)
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        # Set first, so switching to WAL waits for other workers opening the database at the same time
+        connection.execute("PRAGMA busy_timeout=5000")
+        connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only risks losing the last transactions on power loss, not corruption
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA_STATEMENTS:
+            connection.execute(statement)
+        return connection
+
+    async def initialize(self) -> None:
+        """Open the database on the store's thread, create the schema and start purging expired sessions."""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-session-store")
+        self._connection = await asyncio.get_running_loop().run_in_executor(self._executor, self._open)
+        if self.purge_interval_seconds > 0:
+            self._purge_task = asyncio.create_task(self._purge_periodically())
+        logger.info(f"SqliteSessionStore initialized with database: {self.db_path}")
+
+    async def cleanup(self) -> None:
+        """Stop purging, close the connection and the database thread."""
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            try:
+                await self._purge_task
+            except asyncio.CancelledError:
+                pass
+            self._purge_task = None
+        if self._connection is not None:
+            await self._run(lambda connection: connection.close())
+            self._connection = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info("SqliteSessionStore cleaned up.")
+
+    async def warm_up(self) -> None:
+        """Purge sessions that expired while the app was down."""
+        await self.purge_expired_sessions()
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.purge_interval_seconds)
+            try:
+                await self.purge_expired_sessions()
+            except Exception as e:
+                logger.error(f"Failed to purge expired sessions. Error: {e}")
+
+    async def purge_expired_sessions(self) -> int:
+        """Delete all expired sessions with one ranged DELETE on the expires_at index."""
+        now = time.time()
+        deleted = await self._run(
+            lambda connection: connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,)).rowcount)
+        logger.info(f"Purged {deleted} expired sessions.")
+        return deleted
+
+    async def create_session(self, session_id: str, data: Dict) -> None:
+        """Create a new session."""
+        logger.debug(f"Creating session with ID: {session_id}")
+        try:
+            row = (session_id, data.get("username"), data.get("expires_at"), json.dumps(data, separators=(",", ":")))
+            await self._run(lambda connection: connection.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, username, expires_at, data) VALUES (?, ?, ?, ?)", row))
+            logger.info(f"Session created successfully with ID: {session_id}")
+        except Exception as e:
+            logger.error(f"Failed to create session with ID: {session_id}. Error: {e}")
+            raise
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        """Retrieve a session by its ID."""
+        logger.debug(f"Retrieving session with ID: {session_id}")
+        try:
+            row = await self._run(lambda connection: connection.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone())
+            if row is None:
+                logger.warning(f"Session with ID: {session_id} not found")
+                return None
+            logger.info(f"Session retrieved successfully with ID: {session_id}")
+            return json.loads(row[0])
+        except Exception as e:
+            logger.error(f"Failed to retrieve session with ID: {session_id}. Error: {e}")
+            raise
+
+    async def delete_session(self, session_id: str) -> None:
+        """Delete a session by its ID."""
+        logger.debug(f"Deleting session with ID: {session_id}")
+        try:
+            deleted = await self._run(lambda connection: connection.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount)
+            if deleted:
+                logger.info(f"Session deleted successfully with ID: {session_id}")
+            else:
+                logger.warning(f"Session with ID: {session_id} not found")
+        except Exception as e:
+            logger.error(f"Failed to delete session with ID: {session_id}. Error: {e}")
+            raise
+
+    async def list_sessions_for_user(self, username: str) -> List[str]:
+        """List the session IDs of a user through the username index."""
+        logger.debug(f"Listing sessions for username: {username}")
+        try:
+            rows = await self._run(lambda connection: connection.execute(
+                "SELECT session_id FROM sessions WHERE username = ?", (username,)).fetchall())
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to list sessions for username: {username}. Error: {e}")
+            raise
+
+    async def delete_sessions_for_user(self, username: str) -> int:
+        """Delete all sessions of a user with one DELETE through the username index."""
+        logger.debug(f"Deleting all sessions for username: {username}")
+        try:
+            deleted = await self._run(lambda connection: connection.execute(
+                "DELETE FROM sessions WHERE username = ?", (username,)).rowcount)
+            logger.info(f"Deleted {deleted} sessions for username: {username}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete sessions for username: {username}. Error: {e}")
+            raise
+
+    async def clear_sessions(self) -> None:
+        """Clear all sessions."""
+        logger.debug("Clearing all sessions")
+        try:
+            deleted = await self._run(lambda connection: connection.execute("DELETE FROM sessions").rowcount)
+            logger.info(f"All sessions cleared successfully. Deleted: {deleted}")
+        except Exception as e:
+            logger.error(f"Failed to clear all sessions. Error: {e}")
+            raise
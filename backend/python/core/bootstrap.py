@@ -2,16 +2,46 @@ from core.adapters.db.base_db import BaseDB
 from core.adapters.db.json_file_db import JsonFileDB
 from core.adapters.session_store.base_session_store import BaseSessionStore
 from core.adapters.session_store.json_file_session_store import JsonFileSessionStore
+from core.adapters.session_store.redis_session_store import RedisSessionStore
+from core.adapters.session_store.sqlite_session_store import SqliteSessionStore
+from core.adapters.session_store.caching_session_store import CachingSessionStore
+from core.adapters.session_store.shared_memory_session_store import SharedMemorySessionStore
+from core.adapters.rate_limit_store.base_rate_limit_store import BaseRateLimitStore
+from core.adapters.rate_limit_store.in_memory_rate_limit_store import InMemoryRateLimitStore
+from core.adapters.rate_limit_store.redis_rate_limit_store import RedisRateLimitStore
+from core.rate_limiter import LoginRateLimiter
+from core.event_bus import EventBus
+from core.loop_monitor import EventLoopMonitor
+from core.compression import CompressionMiddleware
 from core.logger import Logger
-from config.constants import DB_TYPE, SESSION_STORE_TYPE
+from config.constants import (DB_TYPE, DB_SHARD_COUNT, SESSION_STORE_TYPE, SESSION_CACHE_ENABLED, SESSION_CACHE_MAX_ENTRIES,
+                              SESSION_CACHE_TTL_SECONDS, SESSION_CACHE_NEGATIVE_TTL_SECONDS, SESSION_SHARED_CACHE_ENABLED,
+                              SESSION_SHARED_CACHE_NAME, SESSION_SHARED_CACHE_SLOTS, LOGIN_RATE_LIMIT_ENABLED,
+                              LOGIN_RATE_LIMIT_STORE_TYPE, LOGIN_RATE_LIMIT_USERNAME_CAPACITY, LOGIN_RATE_LIMIT_IP_CAPACITY,
+                              LOGIN_RATE_LIMIT_REFILL_PER_SECOND, LOGIN_RATE_LIMIT_BASE_LOCKOUT_SECONDS,
+                              LOGIN_RATE_LIMIT_MAX_LOCKOUT_SECONDS, LOGIN_RATE_LIMIT_MAX_BUCKETS, USERNAME_FILTER_ENABLED,
+                              USERNAME_FILTER_CAPACITY, USERNAME_FILTER_FALSE_POSITIVE_RATE, RESOURCE_EVENTS_BUFFER_SIZE,
+                              RESOURCE_EVENTS_SUBSCRIBER_QUEUE_SIZE, LOOP_MONITOR_ENABLED, LOOP_MONITOR_INTERVAL_SECONDS,
+                              LOOP_MONITOR_BLOCK_THRESHOLD_SECONDS)
 from fastapi import Depends
 from dao.user_dao import UserDao
 from dao.resource_dao import ResourceDao
-from typing import Optional  # Import Optional for Python 3.6 compatibility
+from utils.bloom_filter import CountingBloomFilter
+from utils import user_utils
+from typing import Dict, Optional, Tuple  # Import Optional for Python 3.6 compatibility
+import asyncio
+import time
 
 # ---- Module-level variables ----
 _db: Optional[BaseDB] = None
 _session_store: Optional[BaseSessionStore] = None
+_login_rate_limiter: Optional[LoginRateLimiter] = None
+_username_filter: Optional[CountingBloomFilter] = None
+_resource_event_bus: Optional[EventBus] = None
+_loop_monitor: Optional[EventLoopMonitor] = None
+_warm_up_task: Optional[asyncio.Task] = None
+_ready = False
+_warm_up_phase_durations: Dict[str, float] = {}
 logger = Logger.get_logger(__name__)
 
 # ---- Factories ----
@@ -21,7 +51,7 @@ def _create_db() -> BaseDB:
     try:
         if DB_TYPE == "json_file":
             logger.info("Initializing JsonFileDB as the database backend.")
-            return JsonFileDB()
+            return JsonFileDB(shard_count=DB_SHARD_COUNT)
         else:
             logger.error(f"Unsupported DB_TYPE: {DB_TYPE}")
             raise ValueError(f"Unsupported DB_TYPE: {DB_TYPE}")
@@ -35,14 +65,49 @@ def _create_session_store() -> BaseSessionStore:
     try:
         if SESSION_STORE_TYPE == "json_file":
             logger.info("Initializing JsonFileSessionStore as the session store backend.")
-            return JsonFileSessionStore()
+            session_store = JsonFileSessionStore()
+        elif SESSION_STORE_TYPE == "redis":
+            logger.info("Initializing RedisSessionStore as the session store backend.")
+            session_store = RedisSessionStore()
+        elif SESSION_STORE_TYPE == "sqlite":
+            logger.info("Initializing SqliteSessionStore as the session store backend.")
+            session_store = SqliteSessionStore()
         else:
             logger.error(f"Unsupported SESSION_STORE_TYPE: {SESSION_STORE_TYPE}")
             raise ValueError(f"Unsupported SESSION_STORE_TYPE: {SESSION_STORE_TYPE}")
+
+        if SESSION_SHARED_CACHE_ENABLED:
+            logger.info("Wrapping the session store backend with SharedMemorySessionStore.")
+            session_store = SharedMemorySessionStore(session_store, table_name=SESSION_SHARED_CACHE_NAME,
+                                                     slot_count=SESSION_SHARED_CACHE_SLOTS)
+
+        if SESSION_CACHE_ENABLED:
+            logger.info("Wrapping the session store backend with CachingSessionStore.")
+            session_store = CachingSessionStore(session_store, max_entries=SESSION_CACHE_MAX_ENTRIES,
+                                                ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+                                                negative_ttl_seconds=SESSION_CACHE_NEGATIVE_TTL_SECONDS)
+        return session_store
     except Exception as e:
         logger.exception(f"Failed to create session store instance. Error: {e}")
         raise
 
+def _create_rate_limit_store() -> BaseRateLimitStore:
+    """Factory function to create the appropriate Rate Limit Store instance based on configuration."""
+    logger.debug("Creating rate limit store instance...")
+    try:
+        if LOGIN_RATE_LIMIT_STORE_TYPE == "memory":
+            logger.info("Initializing InMemoryRateLimitStore as the rate limit store backend.")
+            return InMemoryRateLimitStore(max_buckets=LOGIN_RATE_LIMIT_MAX_BUCKETS)
+        elif LOGIN_RATE_LIMIT_STORE_TYPE == "redis":
+            logger.info("Initializing RedisRateLimitStore as the rate limit store backend.")
+            return RedisRateLimitStore()
+        else:
+            logger.error(f"Unsupported LOGIN_RATE_LIMIT_STORE_TYPE: {LOGIN_RATE_LIMIT_STORE_TYPE}")
+            raise ValueError(f"Unsupported LOGIN_RATE_LIMIT_STORE_TYPE: {LOGIN_RATE_LIMIT_STORE_TYPE}")
+    except Exception as e:
+        logger.exception(f"Failed to create rate limit store instance. Error: {e}")
+        raise
+
 # ---- Accessor Functions ----
 def get_db() -> BaseDB:
     """Get the initialized DB instance."""
@@ -62,39 +127,184 @@ def get_session_store() -> BaseSessionStore:
     logger.debug("Returning the initialized session store instance.")
     return _session_store
 
+def get_login_rate_limiter() -> Optional[LoginRateLimiter]:
+    """Get the login rate limiter, or None if login rate limiting is disabled."""
+    return _login_rate_limiter
+
+def get_resource_event_bus() -> EventBus:
+    """Get the bus that resource changes are published to."""
+    global _resource_event_bus
+    if _resource_event_bus is None:
+        logger.error("Resource event bus is not initialized.")
+        raise RuntimeError("Resource event bus is not initialized.")
+    return _resource_event_bus
+
+def get_loop_monitor() -> Optional[EventLoopMonitor]:
+    """Get the event loop monitor, or None if it is disabled."""
+    return _loop_monitor
+
+def get_readiness() -> Tuple[bool, Dict[str, float]]:
+    """Get whether the app has finished warming up, and the duration of each warm-up phase in seconds."""
+    return _ready, dict(_warm_up_phase_durations)
+
+def get_memory_usage() -> Dict[str, object]:
+    """Get the estimated memory held by each core component of this process, keyed by component."""
+    return {
+        "db": _db.memory_usage() if _db is not None else {},
+        "session_store": _session_store.memory_usage() if _session_store is not None else {},
+        "login_rate_limit_store": _login_rate_limiter.store.memory_usage() if _login_rate_limiter is not None else {},
+        "username_filter": _username_filter.memory_usage() if _username_filter is not None else {},
+        "resource_event_bus": _resource_event_bus.memory_usage() if _resource_event_bus is not None else {},
+        "response_compression_cache": [middleware.memory_usage() for middleware in CompressionMiddleware.instances],
+    }
+
 def get_user_dao(db: BaseDB = Depends(get_db)) -> UserDao:
     """Get an instance of UserDao with the provided DB dependency."""
     logger.debug("Creating UserDao instance.")
-    return UserDao(db)
+    return UserDao(db, username_filter=_username_filter)
 
 def get_resource_dao(db: BaseDB = Depends(get_db)) -> ResourceDao:
     """Get an instance of ResourceDao with the provided DB dependency."""
     logger.debug("Creating ResourceDao instance.")
-    return ResourceDao(db)
+    return ResourceDao(db, event_bus=_resource_event_bus)
+
+async def _build_username_filter(db: BaseDB) -> CountingBloomFilter:
+    """Build the username filter from all users currently in the database."""
+    user_dao = UserDao(db)
+    # Read the version first, so a change made while loading leaves the filter marked stale
+    version = await db.collection_version(user_dao.collection)
+    users, err = await user_dao.get_all_users()
+    if err:
+        raise RuntimeError(f"Failed to load users for the username filter. Error: {err}")
+    username_filter = CountingBloomFilter(capacity=max(USERNAME_FILTER_CAPACITY, 2 * len(users)),
+                                          false_positive_rate=USERNAME_FILTER_FALSE_POSITIVE_RATE)
+    username_filter.rebuild((user["username"] for user in users), version)
+    return username_filter
+
+async def _timed_phase(name: str, coroutine) -> None:
+    """Run one warm-up phase and record its duration."""
+    started_at = time.perf_counter()
+    await coroutine
+    _warm_up_phase_durations[name] = round(time.perf_counter() - started_at, 6)
+    logger.info(f"Warm-up phase '{name}' completed in {_warm_up_phase_durations[name]} seconds.")
+
+async def _warm_up() -> None:
+    """Warm up collections, the session store, indexes and bcrypt before reporting ready."""
+    global _username_filter
+    started_at = time.perf_counter()
+    collections = [UserDao(_db).collection, ResourceDao(_db).collection]
+    await asyncio.gather(
+        _timed_phase("collections", _db.warm_up(collections)),
+        _timed_phase("session_store", _session_store.warm_up()),
+    )
+
+    async def build_indexes():
+        global _username_filter
+        if USERNAME_FILTER_ENABLED and _username_filter is None:
+            _username_filter = await _build_username_filter(_db)
+            logger.info(f"Username filter built with {_username_filter.count} usernames.")
+    await _timed_phase("indexes", build_indexes())
+
+    # Hashing the dummy password once up front also means the first unknown-username login is not slower than later ones
+    await _timed_phase("bcrypt", asyncio.to_thread(user_utils.verify_dummy_password, "warm-up-password"))
+    _warm_up_phase_durations["total"] = round(time.perf_counter() - started_at, 6)
+
+async def _warm_up_in_background() -> None:
+    """
+    Warm up, then report ready. Runs as a task started by startup_event_handler: uvicorn only serves
+    requests once the startup handlers return, so /readyz can only answer 503 while warming up if the
+    warm-up runs after them. If warm-up fails the worker keeps serving but never reports ready.
+    """
+    global _ready
+    try:
+        await _warm_up()
+    except Exception as e:
+        logger.exception(f"Failed to warm up core components. Error: {e}")
+        return
+    _ready = True
+    logger.info(f"Core components warmed up. Phase durations: {_warm_up_phase_durations}")
 
 # ---- Initialization and Cleanup ----
+async def preload() -> None:
+    """
+    Load the read-only data (collection indexes and the username filter) in the launcher, before it
+    forks the workers, so every worker starts with it and shares its memory copy-on-write.
+
+    startup_event_handler reuses what was preloaded; indexes whose files changed in the meantime are
+    reloaded as usual and the username filter is rebuilt when the users collection changed.
+    """
+    global _db, _username_filter
+    logger.info("Preloading collections and indexes...")
+    _db = _create_db()
+    await _db.initialize()
+    await _db.warm_up([UserDao(_db).collection, ResourceDao(_db).collection])
+    if USERNAME_FILTER_ENABLED:
+        _username_filter = await _build_username_filter(_db)
+    logger.info("Collections and indexes preloaded.")
+
 async def startup_event_handler():
     """Initialize the core components during the app startup."""
-    global _db, _session_store
+    global _db, _session_store, _login_rate_limiter, _resource_event_bus, _loop_monitor, _warm_up_task
     logger.info("Starting up core components...")
     try:
-        logger.debug("Creating database instance...")
-        _db = _create_db()
-        await _db.initialize()
-        logger.info("Database initialized successfully.")
+        if LOOP_MONITOR_ENABLED:
+            # Started first so blocking during startup and warm-up is reported too
+            _loop_monitor = EventLoopMonitor(interval_seconds=LOOP_MONITOR_INTERVAL_SECONDS,
+                                             block_threshold_seconds=LOOP_MONITOR_BLOCK_THRESHOLD_SECONDS)
+            await _loop_monitor.start()
+
+        _resource_event_bus = EventBus(buffer_size=RESOURCE_EVENTS_BUFFER_SIZE,
+                                       subscriber_queue_size=RESOURCE_EVENTS_SUBSCRIBER_QUEUE_SIZE)
+
+        if _db is None:
+            logger.debug("Creating database instance...")
+            _db = _create_db()
+            await _db.initialize()
+            logger.info("Database initialized successfully.")
+        else:
+            logger.info("Using the database instance preloaded before forking.")
 
         logger.debug("Creating session store instance...")
         _session_store = _create_session_store()
         await _session_store.initialize()
         logger.info("Session store initialized successfully.")
+
+        if LOGIN_RATE_LIMIT_ENABLED:
+            logger.debug("Creating login rate limiter...")
+            rate_limit_store = _create_rate_limit_store()
+            await rate_limit_store.initialize()
+            _login_rate_limiter = LoginRateLimiter(rate_limit_store, username_capacity=LOGIN_RATE_LIMIT_USERNAME_CAPACITY,
+                                                   ip_capacity=LOGIN_RATE_LIMIT_IP_CAPACITY,
+                                                   refill_per_second=LOGIN_RATE_LIMIT_REFILL_PER_SECOND,
+                                                   base_lockout_seconds=LOGIN_RATE_LIMIT_BASE_LOCKOUT_SECONDS,
+                                                   max_lockout_seconds=LOGIN_RATE_LIMIT_MAX_LOCKOUT_SECONDS)
+            logger.info("Login rate limiter initialized successfully.")
+
+        logger.debug("Warming up core components in the background...")
+        _warm_up_task = asyncio.create_task(_warm_up_in_background())
     except Exception as e:
         logger.exception(f"Failed to initialize core components during startup. Error: {e}")
         raise
 
 async def shutdown_event_handler():
     """Cleanup the core components during the app shutdown."""
-    global _db, _session_store
+    global _db, _session_store, _login_rate_limiter, _username_filter, _resource_event_bus, _loop_monitor, _ready, _warm_up_task
     logger.info("Shutting down core components...")
+    _ready = False
+    if _warm_up_task is not None:
+        if not _warm_up_task.done():
+            logger.info("Cancelling warm-up that is still running.")
+            _warm_up_task.cancel()
+            try:
+                await _warm_up_task
+            except asyncio.CancelledError:
+                pass
+        _warm_up_task = None
+    _username_filter = None
+    if _resource_event_bus is not None:
+        # End the change feed streams that are still open
+        _resource_event_bus.close()
+        _resource_event_bus = None
     try:
         if _db is not None:
             logger.debug("Cleaning up database instance...")
@@ -105,12 +315,24 @@ async def shutdown_event_handler():
             logger.warning("Database instance is already None during shutdown.")
 
         if _session_store is not None:
+            logger.debug("Flushing pending session changes...")
+            await _session_store.flush()
             logger.debug("Cleaning up session store instance...")
             await _session_store.cleanup()
             logger.info("Session store cleaned up successfully.")
             _session_store = None
         else:
             logger.warning("Session store instance is already None during shutdown.")
+
+        if _login_rate_limiter is not None:
+            logger.debug("Cleaning up login rate limiter...")
+            await _login_rate_limiter.store.cleanup()
+            logger.info("Login rate limiter cleaned up successfully.")
+            _login_rate_limiter = None
+
+        if _loop_monitor is not None:
+            await _loop_monitor.stop()
+            _loop_monitor = None
     except Exception as e:
         logger.exception(f"Failed to clean up core components during shutdown. Error: {e}")
         raise
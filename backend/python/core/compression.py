@@ -0,0 +1,208 @@
+import gzip
+import hashlib
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from core.logger import Logger
+from utils.memory_utils import estimate_dict_bytes
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it "br" is never negotiated
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; without it "zstd" is never negotiated
+    zstandard = None
+
+logger = Logger.get_logger(__name__)
+
+COMPRESSIBLE_CONTENT_TYPES = (b"application/json", b"text/")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+def _supported_encodings() -> List[str]:
+    """
+    Encodings in server preference order, limited to the installed codecs.
+
+    zstd comes last: browsers advertise it alongside gzip and br, but many HTTP clients (and proxies
+    forwarding a browser's Accept-Encoding) cannot decode it, so it is only used when the client
+    ranks it strictly above the others.
+    """
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    if zstandard is not None:
+        encodings.append("zstd")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Pick the best supported encoding allowed by an Accept-Encoding header, or None for identity."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    candidates = [(accepted.get(encoding, accepted.get("*", 0.0)), -i, encoding) for i, encoding in enumerate(supported)]
+    best = max(candidates, default=None)
+    if best is None or best[0] <= 0:
+        return None
+    return best[2]
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    """Compress a complete body."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk so streamed responses are not held back."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses with zstd, brotli or gzip as negotiated from Accept-Encoding.
+
+    Complete bodies smaller than `minimum_size` are sent as-is. Streaming responses are compressed
+    chunk by chunk. Compressed bytes of complete bodies are cached by (encoding, body hash), so
+    unchanged listing responses are not recompressed on every request.
+    """
+
+    # Live instances (Starlette creates them when building the middleware stack), for the admin memory report
+    instances: "weakref.WeakSet[CompressionMiddleware]" = weakref.WeakSet()
+
+    def __init__(self, app, minimum_size: int = 1024, cache_max_entries: int = 256):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache_max_entries = cache_max_entries
+        self.supported_encodings = _supported_encodings()
+        self._cache: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        CompressionMiddleware.instances.add(self)
+        logger.info(f"CompressionMiddleware supports encodings: {self.supported_encodings}")
+
+    def _compress_cached(self, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self._cache.get(key)
+        if compressed is not None:
+            self._cache.move_to_end(key)
+            return compressed
+        compressed = compress(encoding, body)
+        self._cache[key] = compressed
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+        return compressed
+
+    def memory_usage(self) -> Dict:
+        """Number of cached compressed bodies and the estimated size of the cache."""
+        return {"cache_entries": len(self._cache), "max_entries": self.cache_max_entries,
+                "cache_bytes": estimate_dict_bytes(self._cache)}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding, self.supported_encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        stream_compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, stream_compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = dict((k.lower(), v) for k, v in message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                if b"content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the start message until the first body chunk tells us whether to compress
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if more_body:
+                    stream_compressor = StreamCompressor(encoding)
+                    body = stream_compressor.compress(body)
+                else:
+                    body = self._compress_cached(encoding, body)
+                    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                await send({**start_message, "headers": headers})
+                start_message = None
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if stream_compressor is not None:
+                body = stream_compressor.compress(body)
+                if not more_body:
+                    body += stream_compressor.finish()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
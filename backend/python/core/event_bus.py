@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+from core.logger import Logger
+from utils.memory_utils import estimate_list_bytes
+
+logger = Logger.get_logger(__name__)
+
+# (event ID, event type, data)
+Event = Tuple[str, str, dict]
+
+# Queued to a subscription when it has to stop: it fell behind, or the bus is closing
+_END = None
+
+
+class Subscription:
+    """Events for one subscriber, in publish order. `resync` is set when events were lost for it."""
+
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=queue_size + 1)
+        self.queue_size = queue_size
+        self.resync = False
+        self.closed = False
+
+    async def next_event(self, timeout: float) -> Optional[Event]:
+        """Wait for the next event. Raises asyncio.TimeoutError if none arrives in time, returns None at the end."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def _offer(self, event: Event) -> None:
+        if self.closed:
+            return
+        if self.queue.qsize() >= self.queue_size:
+            # Slow consumer: stop queueing (so it cannot hold memory) and make it resync from a full listing
+            logger.warning("Event subscriber fell behind, dropping it.")
+            self.resync = True
+            self._close()
+            return
+        self.queue.put_nowait(event)
+
+    def _close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.queue.put_nowait(_END)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe bus with a bounded replay buffer.
+
+    Every published event gets an ID `<epoch>-<sequence>`, where the epoch identifies this bus
+    instance (process and start time), and is kept in a ring buffer of the last `buffer_size` events.
+    A subscriber passing the ID of the last event it saw (SSE Last-Event-ID) first receives the
+    buffered events after it; if that ID is from another epoch (another process, so also another
+    worker) or already fell out of the buffer, the subscription starts with `resync` set. Each
+    subscriber has a bounded queue, with room for its replay on top; a subscriber whose queue is full
+    is dropped with `resync` set instead of slowing down the publishers. A subscriber that resyncs
+    resumes from `last_event_id`.
+    """
+
+    def __init__(self, buffer_size: int, subscriber_queue_size: int):
+        self.buffer_size = buffer_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.epoch = f"{os.getpid():x}{int(time.time() * 1000):x}"
+        self._sequence = 0
+        self._buffer: Deque[Tuple[int, Event]] = deque(maxlen=buffer_size)
+        self._subscriptions: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def last_event_id(self) -> str:
+        """ID of the last event published (`<epoch>-0` before the first one)."""
+        return f"{self.epoch}-{self._sequence}"
+
+    def publish(self, event_type: str, data: dict) -> str:
+        """Publish an event to the replay buffer and all subscribers. Returns the event ID."""
+        self._sequence += 1
+        event = (f"{self.epoch}-{self._sequence}", event_type, data)
+        self._buffer.append((self._sequence, event))
+        for subscription in list(self._subscriptions):
+            subscription._offer(event)
+            if subscription.closed:
+                self._subscriptions.discard(subscription)
+        logger.debug(f"Published event {event[0]} of type: {event_type} to {len(self._subscriptions)} subscribers.")
+        return event[0]
+
+    def _replay_after(self, last_event_id: str) -> Optional[List[Event]]:
+        """Buffered events after last_event_id, or None if they cannot all be replayed."""
+        epoch, _, sequence = last_event_id.rpartition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._sequence:
+            return None
+        oldest = self._buffer[0][0] if self._buffer else self._sequence + 1
+        if sequence < oldest - 1:
+            return None
+        return [event for event_sequence, event in self._buffer if event_sequence > sequence]
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Subscribe to new events, first replaying the buffered events after last_event_id."""
+        missed: List[Event] = []
+        if last_event_id:
+            replay = self._replay_after(last_event_id)
+            if replay is None:
+                logger.info(f"Cannot replay events after: {last_event_id}, subscriber must resync.")
+                subscription = Subscription(self.subscriber_queue_size)
+                subscription.resync = True
+                subscription._close()
+                return subscription
+            missed = replay
+        # Room for the whole replay (at most buffer_size events) on top of the live queue
+        subscription = Subscription(self.subscriber_queue_size + len(missed))
+        if missed:
+            logger.debug(f"Replaying {len(missed)} events after: {last_event_id}")
+            for event in missed:
+                subscription._offer(event)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        subscription.closed = True
+
+    def close(self) -> None:
+        """End all subscriptions (on shutdown), so open streams finish."""
+        for subscription in list(self._subscriptions):
+            subscription._close()
+        self._subscriptions.clear()
+
+    def memory_usage(self) -> dict:
+        """Events in the replay buffer and queued for subscribers, with the estimated size of the buffer."""
+        return {"buffered_events": len(self._buffer), "buffer_size": self.buffer_size,
+                "buffer_bytes": estimate_list_bytes(self._buffer), "subscribers": len(self._subscriptions),
+                "queued_events": sum(subscription.queue.qsize() for subscription in self._subscriptions)}
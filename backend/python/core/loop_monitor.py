@@ -0,0 +1,159 @@
+import asyncio
+import bisect
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+# Upper bounds (seconds) of the lag histogram buckets; the last bucket is +Inf
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Innermost frames of the loop thread's stack logged when the loop is blocked
+BLOCKING_STACK_DEPTH = 20
+
+# ASGI scope of the request each task is handling, so a blocked loop can be attributed to a route
+_request_scopes: Dict[asyncio.Task, dict] = {}
+
+
+def _route_of(scope: dict) -> str:
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}".strip()
+
+
+class RequestTrackingMiddleware:
+    """ASGI middleware that records which request the current task is handling, for EventLoopMonitor."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        _request_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scopes.pop(task, None)
+
+
+class LagHistogram:
+    """Cumulative histogram of event loop lag samples, exported in the Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LAG_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def to_prometheus(self, name: str, help_text: str) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{"+Inf" if bound == float("inf") else bound}"}} {cumulative}')
+        lines.append(f"{name}_sum {self.total}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class EventLoopMonitor:
+    """
+    Watchdog for the event loop.
+
+    A task on the loop sleeps `interval_seconds` at a time and records how late it wakes up (the
+    loop lag) in a histogram. A helper thread watches the task's heartbeat: when the loop has not
+    come back for `block_threshold_seconds`, something is running synchronously on it, so the thread
+    captures the loop thread's current stack and logs it with the route of the request being handled.
+    Each blocking episode is reported once.
+    """
+
+    def __init__(self, interval_seconds: float, block_threshold_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.block_threshold_seconds = block_threshold_seconds
+        self.lag = LagHistogram()
+        self.blocked_count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def start(self) -> None:
+        """Start measuring lag on the running loop and watching it from a helper thread."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._measure_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started with interval: {self.interval_seconds} seconds, "
+                    f"block threshold: {self.block_threshold_seconds} seconds.")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        logger.info("Event loop monitor stopped.")
+
+    async def _measure_lag(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self.lag.observe(max(0.0, now - expected))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.block_threshold_seconds / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked_for < self.block_threshold_seconds or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self.blocked_count += 1
+            self._report_blocked(blocked_for)
+
+    def _report_blocked(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is not None:
+            stack = "".join(traceback.format_stack(frame, limit=BLOCKING_STACK_DEPTH))
+        else:
+            stack = "(stack unavailable)\n"
+        task = asyncio.current_task(self._loop)
+        scope = _request_scopes.get(task) if task is not None else None
+        route = _route_of(scope) if scope is not None else "(no request)"
+        logger.warning(f"Event loop blocked for at least {round(blocked_for, 3)} seconds while handling: {route}\n"
+                       f"Blocking stack:\n{stack}")
+
+    def to_prometheus(self) -> List[str]:
+        """Lag histogram and blocked-episode counter in the Prometheus text format."""
+        return self.lag.to_prometheus("event_loop_lag_seconds", "Delay of the event loop in running a due callback.") + [
+            "# HELP event_loop_max_lag_seconds Largest event loop lag observed.",
+            "# TYPE event_loop_max_lag_seconds gauge",
+            f"event_loop_max_lag_seconds {self.lag.max}",
+            "# HELP event_loop_blocked_total Times the event loop was blocked longer than the threshold.",
+            "# TYPE event_loop_blocked_total counter",
+            f"event_loop_blocked_total {self.blocked_count}",
+        ]
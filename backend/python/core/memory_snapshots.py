@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from core.profiler import _short_path
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+GROUP_BY = ("module", "line")
+
+# (file, line number) -> (bytes, number of memory blocks)
+LineStats = Dict[Tuple[str, int], Tuple[int, int]]
+
+
+def _module_files() -> Dict[str, str]:
+    """Module name by source file, for the modules imported so far."""
+    modules = {}
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename:
+            modules[os.path.abspath(filename)] = name
+    return modules
+
+
+class MemorySnapshot:
+    """Allocations traced by tracemalloc at one point in time, summed per source line."""
+
+    def __init__(self, snapshot_id: int, lines: LineStats, traced_bytes: int):
+        self.id = snapshot_id
+        self.taken_at = time.time()
+        self.lines = lines
+        self.traced_bytes = traced_bytes
+
+    def grouped(self, group_by: str) -> Dict[str, Tuple[int, int]]:
+        """(bytes, blocks) per module (the module that allocated, by source file) or per line."""
+        modules = _module_files() if group_by == "module" else {}
+        groups: Dict[str, Tuple[int, int]] = {}
+        for (filename, lineno), (size, count) in self.lines.items():
+            if group_by == "module":
+                name = modules.get(os.path.abspath(filename)) or _short_path(filename)
+            else:
+                name = f"{_short_path(filename)}:{lineno}"
+            group_size, group_count = groups.get(name, (0, 0))
+            groups[name] = (group_size + size, group_count + count)
+        return groups
+
+    def top(self, group_by: str, limit: int) -> List[dict]:
+        """The `limit` groups holding the most memory."""
+        groups = sorted(self.grouped(group_by).items(), key=lambda item: -item[1][0])
+        return [{"name": name, "size_bytes": size, "blocks": count} for name, (size, count) in groups[:limit]]
+
+    def diff(self, older: "MemorySnapshot", group_by: str, limit: int) -> List[dict]:
+        """The `limit` groups whose memory changed the most since the older snapshot."""
+        new, old = self.grouped(group_by), older.grouped(group_by)
+        changes = []
+        for name in new.keys() | old.keys():
+            size, count = new.get(name, (0, 0))
+            old_size, old_count = old.get(name, (0, 0))
+            if size != old_size or count != old_count:
+                changes.append({"name": name, "size_bytes": size, "size_diff_bytes": size - old_size,
+                                "blocks": count, "blocks_diff": count - old_count})
+        changes.sort(key=lambda change: -abs(change["size_diff_bytes"]))
+        return changes[:limit]
+
+
+class MemorySnapshotStore:
+    """
+    Takes tracemalloc snapshots of this process and keeps the last `max_snapshots` of them for diffing.
+
+    Tracing starts with the first snapshot (keeping `frames` frames per allocation), so that snapshot
+    only sees what is allocated from then on and serves as the baseline for later ones. Snapshots are
+    reduced to per-line totals, which are much smaller than the traces themselves. Tracing slows
+    allocations down and uses memory of its own until `stop` is called.
+    """
+
+    def __init__(self, max_snapshots: int, frames: int):
+        self.max_snapshots = max(1, max_snapshots)
+        self.frames = max(1, frames)
+        self._snapshots: "OrderedDict[int, MemorySnapshot]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def take(self) -> MemorySnapshot:
+        """Take a snapshot, starting tracing first if needed. Blocking; call it from a worker thread."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                logger.info(f"Started tracing memory allocations with {self.frames} frames.")
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+            lines: LineStats = {}
+            for statistic in snapshot.statistics("lineno"):
+                frame = statistic.traceback[0]
+                lines[(frame.filename, frame.lineno)] = (statistic.size, statistic.count)
+            memory_snapshot = MemorySnapshot(self._next_id, lines, tracemalloc.get_traced_memory()[0])
+            self._next_id += 1
+            self._snapshots[memory_snapshot.id] = memory_snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        logger.info(f"Took memory snapshot {memory_snapshot.id} with {len(lines)} lines, "
+                    f"{memory_snapshot.traced_bytes} bytes traced.")
+        return memory_snapshot
+
+    def get(self, snapshot_id: int) -> Optional[MemorySnapshot]:
+        return self._snapshots.get(snapshot_id)
+
+    def stop(self) -> None:
+        """Drop the snapshots and stop tracing."""
+        with self._lock:
+            self._snapshots.clear()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+                logger.info("Stopped tracing memory allocations.")
+
+    def status(self) -> dict:
+        """Whether tracing is on, the memory it traces and uses itself, and the snapshots kept."""
+        traced_bytes, peak_traced_bytes = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traced_bytes": traced_bytes,
+            "peak_traced_bytes": peak_traced_bytes,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": [{"id": snapshot.id, "taken_at": snapshot.taken_at, "traced_bytes": snapshot.traced_bytes}
+                          for snapshot in self._snapshots.values()],
+        }
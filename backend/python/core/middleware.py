@@ -5,7 +5,7 @@ from utils import session_utils
 
 logger = Logger.get_logger(__name__)
 
-async def validate_session_id_in_request(request: Request):
+async def validate_session_id_in_request(request: Request) -> dict:
     session_id = request.cookies.get("session_id")
     if not session_id:
         logger.warning("No session_id found in cookies.")
@@ -26,8 +26,15 @@ async def validate_session_id_in_request(request: Request):
                 raise HTTPException(status_code=403, details=f"Session data malformed for session_id: {session_id}")
             elif session_utils.is_session_valid(session_expires_at):
                 logger.info(f"Existing session is valid for session_id: {session_id}.")
-                return
+                return existing_session
             else:
                 logger.info(f"Existing session has expired for session_id: {session_id}, deleting session.")
                 await session_store.delete_session(session_id)    
-                raise HTTPException(status_code=403, details=f"Existing session has expired for session_id: {session_id}")
\ No newline at end of file
+                raise HTTPException(status_code=403, details=f"Existing session has expired for session_id: {session_id}")
+
+async def validate_admin_session_in_request(request: Request) -> dict:
+    session = await validate_session_id_in_request(request)
+    if session.get("role") != "ADMIN":
+        logger.warning(f"Session for username: {session.get('username')} does not have the ADMIN role.")
+        raise HTTPException(status_code=403, detail="ADMIN role required.")
+    return session
@@ -0,0 +1,126 @@
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+# (function name, file, first line of the function)
+Frame = Tuple[str, str, int]
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"] + os.sep
+_SITE_PACKAGES = "site-packages" + os.sep
+
+
+def _short_path(filename: str) -> str:
+    """File path relative to the backend directory, site-packages or the standard library, to keep frame names readable."""
+    index = filename.rfind(_SITE_PACKAGES)
+    if index != -1:
+        return filename[index + len(_SITE_PACKAGES):]
+    for prefix in (_BACKEND_DIR, _STDLIB_DIR):
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the Python stacks of every thread of the process.
+
+    A helper thread wakes up every `interval_seconds`, reads all stacks with sys._current_frames()
+    and counts them, so the profiled code is not instrumented and the event loop keeps running
+    normally. Frames are identified by function (not line), which keeps the number of distinct
+    stacks low. Each sample is weighted by the time elapsed since the previous one, so samples
+    delayed by a thread holding the GIL still account for the right amount of time.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        # (thread name, outermost frame, ..., innermost frame) -> seconds
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.duration_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._frame_names: Dict[Frame, str] = {}
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        logger.info(f"Sampling profiler started with interval: {self.interval_seconds} seconds.")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration_seconds = time.perf_counter() - self.started_at
+        logger.info(f"Sampling profiler stopped after {self.sample_count} samples, {len(self.stacks)} distinct stacks.")
+
+    def _run(self) -> None:
+        own_thread_id = threading.get_ident()
+        last_sample_at = time.perf_counter()
+        while not self._stop.wait(self.interval_seconds):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            now = time.perf_counter()
+            weight = now - last_sample_at
+            last_sample_at = now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                frames.reverse()
+                self.stacks[(thread_names.get(thread_id, f"thread-{thread_id}"),) + tuple(frames)] += weight
+            self.sample_count += 1
+
+    def _frame_name(self, frame: Frame) -> str:
+        name = self._frame_names.get(frame)
+        if name is None:
+            name = self._frame_names[frame] = f"{frame[0]} ({_short_path(frame[1])}:{frame[2]})"
+        return name
+
+    def to_collapsed(self) -> str:
+        """Collapsed stacks ("thread;outer;...;inner <microseconds>" per line), the input of flamegraph.pl and speedscope."""
+        lines = []
+        for stack, seconds in self.stacks.most_common():
+            names = [stack[0]] + [self._frame_name(frame) for frame in stack[1:]]
+            lines.append(f"{';'.join(name.replace(';', ':') for name in names)} {round(seconds * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> dict:
+        """Speedscope file with one sampled profile per thread."""
+        frames: List[dict] = []
+        frame_indexes: Dict[Frame, int] = {}
+        profiles: Dict[str, dict] = {}
+        for stack, seconds in self.stacks.items():
+            indexes = []
+            for frame in stack[1:]:
+                index = frame_indexes.get(frame)
+                if index is None:
+                    index = frame_indexes[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": _short_path(frame[1]), "line": frame[2]})
+                indexes.append(index)
+            profile = profiles.setdefault(stack[0], {"type": "sampled", "name": stack[0], "unit": "seconds",
+                                                     "startValue": 0, "endValue": 0, "samples": [], "weights": []})
+            profile["samples"].append(indexes)
+            profile["weights"].append(seconds)
+            profile["endValue"] += seconds
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": f"Sampling profile of process {os.getpid()} ({round(self.duration_seconds, 3)} s, {self.sample_count} samples)",
+            "exporter": "session-based-login",
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda profile: -profile["endValue"]),
+        }
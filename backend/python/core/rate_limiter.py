@@ -0,0 +1,105 @@
+import math
+import time
+from typing import Dict, Optional
+from core.adapters.rate_limit_store.base_rate_limit_store import BaseRateLimitStore
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+class LoginRateLimiter:
+    """
+    Token-bucket limiter for login attempts, keyed by (username, client IP) and by client IP.
+
+    Every attempt takes a token from both buckets before any DB or bcrypt work is done, and a
+    successful login gives the IP bucket its token back, so the IP limit only counts failures.
+    When a bucket runs dry the key is locked out; each consecutive lockout doubles
+    (up to `max_lockout_seconds`) until the bucket state expires after a quiet period.
+
+    The username bucket is per client IP so that failed attempts from one address cannot lock
+    the account out for everyone else. The trade-off is that a guesser spreading attempts on one
+    account over many addresses is only slowed down by the per-IP buckets.
+    """
+
+    def __init__(self, store: BaseRateLimitStore, username_capacity: int, ip_capacity: int,
+                 refill_per_second: float, base_lockout_seconds: int, max_lockout_seconds: int):
+        if refill_per_second <= 0:
+            logger.error(f"Invalid login rate limit refill rate: {refill_per_second}")
+            raise ValueError(f"LOGIN_RATE_LIMIT_REFILL_PER_SECOND must be greater than 0, got: {refill_per_second}")
+        self.store = store
+        self.username_capacity = username_capacity
+        self.ip_capacity = ip_capacity
+        self.refill_per_second = refill_per_second
+        self.base_lockout_seconds = base_lockout_seconds
+        self.max_lockout_seconds = max_lockout_seconds
+
+    async def _get_bucket(self, key: str, capacity: int, now: float) -> Dict:
+        """Current state of a bucket, refilled up to now unless it is locked out."""
+        bucket = await self.store.get_bucket(key) or {"tokens": capacity, "updated_at": now, "locked_until": 0, "strikes": 0}
+        if bucket["locked_until"] <= now:
+            bucket["tokens"] = min(capacity, bucket["tokens"] + (now - bucket["updated_at"]) * self.refill_per_second)
+            bucket["updated_at"] = now
+        return bucket
+
+    async def _save_bucket(self, key: str, bucket: Dict, capacity: int, now: float) -> None:
+        # Keep the state until the bucket would be full again after any lockout, so strikes decay on their own.
+        ttl_seconds = max(bucket["locked_until"] - now, 0) + capacity / self.refill_per_second
+        await self.store.set_bucket(key, bucket, math.ceil(ttl_seconds))
+
+    def _lock_out(self, key: str, bucket: Dict, now: float) -> int:
+        """Lock out an empty bucket, doubling the lockout with each strike. Returns the seconds to wait."""
+        bucket["strikes"] += 1
+        lockout = min(self.base_lockout_seconds * 2 ** (bucket["strikes"] - 1), self.max_lockout_seconds)
+        bucket["locked_until"] = now + lockout
+        logger.warning(f"Login rate limit exceeded for key: {key}, locked out for {lockout} seconds.")
+        return math.ceil(lockout)
+
+    @staticmethod
+    def _username_key(username: str, client_ip: Optional[str]) -> str:
+        return f"username:{username}:ip:{client_ip or ''}"
+
+    @staticmethod
+    def _ip_key(client_ip: str) -> str:
+        return f"ip:{client_ip}"
+
+    async def check(self, username: str, client_ip: Optional[str]) -> int:
+        """
+        Record a login attempt. Returns 0 if it may proceed, otherwise the Retry-After seconds. Both
+        buckets are checked before a token is taken from either, so an attempt rejected by one bucket
+        does not drain the other.
+        """
+        now = time.time()
+        keys = [(self._username_key(username, client_ip), self.username_capacity)]
+        if client_ip:
+            keys.append((self._ip_key(client_ip), self.ip_capacity))
+        buckets = [await self._get_bucket(key, capacity, now) for key, capacity in keys]
+
+        locked = [math.ceil(bucket["locked_until"] - now) for bucket in buckets if bucket["locked_until"] > now]
+        if locked:
+            return max(locked)
+
+        retry_after = 0
+        for (key, capacity), bucket in zip(keys, buckets):
+            if bucket["tokens"] < 1:
+                retry_after = max(retry_after, self._lock_out(key, bucket, now))
+                await self._save_bucket(key, bucket, capacity, now)
+        if retry_after:
+            return retry_after
+
+        for (key, capacity), bucket in zip(keys, buckets):
+            bucket["tokens"] -= 1
+            await self._save_bucket(key, bucket, capacity, now)
+        return 0
+
+    async def reset(self, username: str, client_ip: Optional[str]) -> None:
+        """
+        After a successful login, reset the username bucket of the client IP and give the IP bucket its
+        token back, so successful logins (many users behind one NAT address) do not use up the IP's limit.
+        """
+        await self.store.delete_bucket(self._username_key(username, client_ip))
+        if client_ip:
+            now = time.time()
+            key = self._ip_key(client_ip)
+            bucket = await self._get_bucket(key, self.ip_capacity, now)
+            if bucket["locked_until"] <= now:
+                bucket["tokens"] = min(self.ip_capacity, bucket["tokens"] + 1)
+                await self._save_bucket(key, bucket, self.ip_capacity, now)
@@ -1,13 +1,20 @@
 from typing import Any, Tuple, List, Dict, Optional
 from core.adapters.db.base_db import BaseDB
+from core.event_bus import EventBus
 from core.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
 class ResourceDao:
-    def __init__(self, db: BaseDB):
+    def __init__(self, db: BaseDB, event_bus: Optional[EventBus] = None):
         self.db = db
         self.collection = "resources"
+        self.event_bus = event_bus
+
+    def _publish(self, event_type: str, data: dict) -> None:
+        """Publish a change to the resource change feed, if there is one."""
+        if self.event_bus is not None:
+            self.event_bus.publish(event_type, data)
 
     async def create_resource(self, resource_data: dict) -> Tuple[Optional[Dict], Any]:
         """Create a resource in the database"""
@@ -15,6 +22,7 @@ class ResourceDao:
             logger.info(f"Creating resource with data: {resource_data}")
             resource = await self.db.create_record(self.collection, resource_data)
             logger.info(f"Resource created successfully with ID: {resource.get('id')}")
+            self._publish("resource.created", resource)
             return resource, None
         except Exception as e:
             logger.error(f"Error creating resource: {e}")
@@ -42,6 +50,7 @@ class ResourceDao:
             updated_resource = await self.db.update_record(self.collection, resource_id, update_data)
             if updated_resource:
                 logger.info(f"resource updated successfully with ID: {resource_id}")
+                self._publish("resource.updated", updated_resource)
                 return updated_resource, None
             else:
                 logger.warning(f"resource not found with ID: {resource_id}")
@@ -57,6 +66,7 @@ class ResourceDao:
             success = await self.db.delete_record(self.collection, resource_id)
             if success:
                 logger.info(f"resource deleted successfully with ID: {resource_id}")
+                self._publish("resource.deleted", {"id": resource_id})
                 return True, None
             else:
                 logger.warning(f"resource not found with ID: {resource_id}")
@@ -76,6 +86,18 @@ class ResourceDao:
             logger.error(f"Error retrieving all resources. Error: {e}")
             return [], e
         
+    async def get_resources_page(self, after: Optional[str], limit: int) -> Tuple[List[Dict], Any]:
+        """Retrieve up to `limit` resources in ID order, starting after the resource ID `after` (keyset pagination)."""
+        try:
+            logger.info(f"Retrieving resources page after: {after} with limit: {limit}")
+            resources = await self.db.get_records_in_range(self.collection, start_id=after, limit=limit,
+                                                           include_start=after is None)
+            logger.info(f"Successfully retrieved {len(resources)} resources")
+            return resources, None
+        except Exception as e:
+            logger.error(f"Error retrieving resources page after: {after}. Error: {e}")
+            return [], e
+
     async def get_resource_by_name(self, name: str) -> Tuple[Optional[Dict], Any]:
         """Retrieve a resource by name from the database."""
         try:
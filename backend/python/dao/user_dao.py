@@ -1,19 +1,26 @@
+import asyncio
 from typing import Any, Tuple, List, Dict, Optional
 from core.adapters.db.base_db import BaseDB
 from core.logger import Logger
+from utils.bloom_filter import CountingBloomFilter
 
 logger = Logger.get_logger(__name__)
 
 class UserDao:
-    def __init__(self, db: BaseDB):
+    def __init__(self, db: BaseDB, username_filter: Optional[CountingBloomFilter] = None):
         self.db = db
         self.collection = "users"
+        self.username_filter = username_filter
 
     async def create_user(self, user_data: dict) -> Tuple[Optional[Dict], Any]:
         """Create a user in the database."""
         try:
             logger.info(f"Creating user with data: {user_data}")
+            version = await self._filter_version_before_write()
             user = await self.db.create_record(self.collection, user_data)
+            if self.username_filter is not None:
+                self.username_filter.add(user["username"])
+                await self._advance_filter_version(version)
             logger.info(f"User created successfully with ID: {user.get('id')}")
             return user, None
         except Exception as e:
@@ -54,8 +61,13 @@ class UserDao:
         """Delete a user from the database."""
         try:
             logger.info(f"Deleting user with ID: {user_id}")
+            user = await self.db.get_record_by_id(self.collection, user_id) if self.username_filter is not None else None
+            version = await self._filter_version_before_write()
             success = await self.db.delete_record(self.collection, user_id)
             if success:
+                if user is not None:
+                    self.username_filter.remove(user["username"])
+                    await self._advance_filter_version(version)
                 logger.info(f"User deleted successfully with ID: {user_id}")
                 return True, None
             else:
@@ -76,10 +88,44 @@ class UserDao:
             logger.error(f"Error retrieving all users. Error: {e}")
             return [], e
 
+    async def _filter_version_before_write(self) -> Optional[object]:
+        return await self.db.collection_version(self.collection) if self.username_filter is not None else None
+
+    async def _advance_filter_version(self, version_before: Optional[object]) -> None:
+        """
+        After a write of this process that the filter was updated for, mark the filter as reflecting the
+        new collection version, provided it reflected the version before the write. Otherwise the next
+        negative lookup would take the own write for another worker's and rebuild the whole filter.
+        """
+        if version_before is not None and version_before == self.username_filter.version:
+            self.username_filter.version = await self.db.collection_version(self.collection)
+
+    async def _username_ruled_out(self, username: str) -> bool:
+        """
+        Whether the username filter proves the username is not taken. A miss is only trusted while the
+        filter reflects the current users collection; users created by another worker change the
+        collection version, and the filter is then rebuilt from storage before answering.
+        """
+        if self.username_filter is None or self.username_filter.might_contain(username):
+            return False
+        version = await self.db.collection_version(self.collection)
+        if version is None:
+            return False
+        if version != self.username_filter.version:
+            logger.info("Users collection changed since the username filter was built, rebuilding it.")
+            users = await self.db.get_all_records(self.collection)
+            # Hashing every username is CPU-bound; the filter swaps in the new counters when done
+            await asyncio.to_thread(self.username_filter.rebuild, [user["username"] for user in users], version)
+            return not self.username_filter.might_contain(username)
+        return True
+
     async def get_user_by_username(self, username: str) -> Tuple[Optional[Dict], Any]:
         """Retrieve a user by username from the database."""
         try:
             logger.info(f"Retrieving user with username: {username}")
+            if await self._username_ruled_out(username):
+                logger.info(f"Username filter rules out username: {username}, skipping lookup.")
+                return None, None
             users = await self.db.get_all_records(self.collection)
             for user in users:
                 if user.get("username") == username:
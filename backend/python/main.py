@@ -3,9 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from api.user_api import user_api_router
 from api.login_api import login_api_router
 from api.resource_api import resource_api_router
+from api.health_api import health_api_router
+from api.admin_api import admin_api_router
 from core.bootstrap import startup_event_handler, shutdown_event_handler
-from core.middleware import validate_session_id_in_request
+from core.middleware import validate_session_id_in_request, validate_admin_session_in_request
+from core.compression import CompressionMiddleware
+from core.loop_monitor import RequestTrackingMiddleware
 from core.logger import Logger
+from config.constants import (RESPONSE_COMPRESSION_ENABLED, RESPONSE_COMPRESSION_MIN_SIZE, RESPONSE_COMPRESSION_CACHE_MAX_ENTRIES,
+                              LOOP_MONITOR_ENABLED)
 
 logger = Logger.get_logger(__name__)
 
@@ -23,6 +29,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Add response compression middleware
+if RESPONSE_COMPRESSION_ENABLED:
+    logger.info("Adding response compression middleware.")
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=RESPONSE_COMPRESSION_MIN_SIZE,
+        cache_max_entries=RESPONSE_COMPRESSION_CACHE_MAX_ENTRIES,
+    )
+
+# Record the request each task is handling, so the event loop monitor can name the route that blocked the loop
+if LOOP_MONITOR_ENABLED:
+    logger.info("Adding request tracking middleware.")
+    app.add_middleware(RequestTrackingMiddleware)
+
 # Include API routers
 logger.info("Including user API router.")
 app.include_router(user_api_router, prefix="/api/v1")
@@ -32,6 +52,13 @@ logger.info("Including resource API router.")
 app.include_router(resource_api_router, prefix="/api/v1",
                    dependencies=[Depends(validate_session_id_in_request)])
 
+logger.info("Including admin API router.")
+app.include_router(admin_api_router, prefix="/api/v1/admin",
+                   dependencies=[Depends(validate_admin_session_in_request)])
+
+logger.info("Including health API router.")
+app.include_router(health_api_router)
+
 # Add event handlers
 logger.info("Adding startup and shutdown event handlers.")
 app.add_event_handler("startup", startup_event_handler)
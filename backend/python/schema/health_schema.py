@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Dict
+
+class HealthResponseSchema(BaseModel):
+    status: str
+
+class ReadinessResponseSchema(BaseModel):
+    status: str
+    phases: Dict[str, float]
@@ -20,4 +20,6 @@ class GetResourceResponseSchema(BaseModel):
 
 class GetAllResourcesResponseSchema(BaseModel):
     items: List[GetResourceResponseSchema]
+    # Number of items in this response (the page size for paginated requests, not the collection size)
     total: int
+    nextCursor: Optional[str] = None
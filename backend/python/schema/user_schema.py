@@ -24,3 +24,6 @@ class GetAllUsersResponseSchema(BaseModel):
     items: List[GetUserResponseSchema]
     total: int
 
+class RevokeUserSessionsResponseSchema(BaseModel):
+    message: str
+    revoked: int
@@ -0,0 +1,179 @@
+"""
+Production launcher for the backend.
+
+    python serve.py [--host HOST] [--port PORT] [--workers N] [--reuse-port] [--preload]
+
+Runs N uvicorn worker processes (default: SERVE_WORKERS, 1; 0 means one per CPU core), using uvloop
+and httptools when they are installed. Workers either share one listening socket created by this
+process, or with --reuse-port each bind their own SO_REUSEPORT socket so the kernel balances
+connections. With --preload the app is imported and the collection indexes and username filter are
+loaded before forking, so workers share those pages copy-on-write. Several workers are refused with
+stores whose in-memory state is authoritative, and a warning is logged for stores that are only
+per worker. SIGTERM/SIGINT are forwarded to the workers, which stop accepting connections,
+finish in-flight requests (up to --graceful-timeout) and run shutdown_event_handler.
+With SESSION_SHARED_CACHE_ENABLED the shared session table is created here, before forking (workers
+only attach to it), so it survives worker restarts; it is removed when all workers have stopped.
+"""
+import argparse
+import asyncio
+import gc
+import importlib.util
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from config.constants import (SERVE_HOST, SERVE_PORT, SERVE_WORKERS, SERVE_GRACEFUL_TIMEOUT_SECONDS,
+                              SESSION_SHARED_CACHE_ENABLED, SESSION_SHARED_CACHE_NAME, SESSION_SHARED_CACHE_SLOTS,
+                              SESSION_STORE_TYPE, SESSION_STORE_DURABILITY, SESSION_CACHE_ENABLED,
+                              SESSION_CACHE_TTL_SECONDS, LOGIN_RATE_LIMIT_ENABLED, LOGIN_RATE_LIMIT_STORE_TYPE)
+from core.adapters.session_store.shared_memory_session_store import SharedSessionTable
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+APP_IMPORT_STRING = "main:app"
+WORKER_RESTART_DELAY_SECONDS = 1
+
+
+def _detect_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _detect_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def _bind_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform.")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, host: str, port: int, shared_socket: Optional[socket.socket], reuse_port: bool,
+                graceful_timeout: int) -> None:
+    """Worker process entry point: serve the app on the shared socket or on an own SO_REUSEPORT socket."""
+    # Drop the supervisor's handlers inherited through fork; uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    sock = shared_socket if shared_socket is not None else _bind_socket(host, port, reuse_port=True)
+    config = uvicorn.Config(app, loop=_detect_loop(), http=_detect_http(), lifespan="on",
+                            timeout_graceful_shutdown=graceful_timeout, log_level="info")
+    server = uvicorn.Server(config)
+    logger.info(f"Worker {os.getpid()} serving on {host}:{port} (reuse_port={reuse_port}).")
+    server.run(sockets=[sock])
+
+
+def _check_multi_worker_config(workers: int) -> None:
+    """Refuse several workers with stores whose in-memory state is authoritative; warn about per-worker stores."""
+    if workers <= 1:
+        return
+    if SESSION_STORE_TYPE == "json_file" and SESSION_STORE_DURABILITY != "sync":
+        raise SystemExit(f"SESSION_STORE_DURABILITY={SESSION_STORE_DURABILITY} keeps sessions in the memory of one "
+                         f"process; run a single worker, or use SESSION_STORE_DURABILITY=sync or a shared session store.")
+    if LOGIN_RATE_LIMIT_ENABLED and LOGIN_RATE_LIMIT_STORE_TYPE == "memory":
+        logger.warning(f"Login rate limit buckets are per worker with LOGIN_RATE_LIMIT_STORE_TYPE=memory, so a client "
+                       f"gets up to {workers}x the configured attempts; use LOGIN_RATE_LIMIT_STORE_TYPE=redis.")
+    if SESSION_CACHE_ENABLED:
+        logger.warning(f"The session cache is per worker, so a logout may not be seen by other workers for up to "
+                       f"SESSION_CACHE_TTL_SECONDS ({SESSION_CACHE_TTL_SECONDS} seconds).")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the backend with multiple uvicorn workers.")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS or os.cpu_count() or 1)
+    parser.add_argument("--reuse-port", action="store_true", help="Bind one SO_REUSEPORT socket per worker.")
+    parser.add_argument("--preload", action="store_true",
+                        help="Import the app and load the collections and indexes before forking workers.")
+    parser.add_argument("--graceful-timeout", type=int, default=SERVE_GRACEFUL_TIMEOUT_SECONDS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    _check_multi_worker_config(args.workers)
+    ctx = multiprocessing.get_context("fork")
+    logger.info(f"Starting {args.workers} workers on {args.host}:{args.port} "
+                f"(loop={_detect_loop()}, http={_detect_http()}, reuse_port={args.reuse_port}, preload={args.preload}).")
+
+    app = APP_IMPORT_STRING
+    if args.preload:
+        from main import app
+        from core import bootstrap
+        asyncio.run(bootstrap.preload())
+        # Move everything allocated so far out of the GC's view, so collections in the workers
+        # do not touch (and copy) the pages shared with this process.
+        gc.collect()
+        gc.freeze()
+
+    shared_session_table = None
+    if SESSION_SHARED_CACHE_ENABLED:
+        try:
+            shared_session_table = SharedSessionTable.create(SESSION_SHARED_CACHE_NAME, SESSION_SHARED_CACHE_SLOTS)
+        except RuntimeError as e:
+            raise SystemExit(f"{e} Remove it or set another SESSION_SHARED_CACHE_NAME.")
+
+    shared_socket = None if args.reuse_port else _bind_socket(args.host, args.port, reuse_port=False)
+    workers: Dict[int, multiprocessing.Process] = {}
+    shutting_down = False
+
+    def spawn(slot: int) -> None:
+        process = ctx.Process(target=_run_worker, name=f"worker-{slot}",
+                              args=(app, args.host, args.port, shared_socket, args.reuse_port, args.graceful_timeout))
+        process.start()
+        workers[slot] = process
+
+    def handle_signal(signum, frame):
+        nonlocal shutting_down
+        if shutting_down:
+            return
+        shutting_down = True
+        logger.info(f"Received signal {signum}, draining workers.")
+        for process in workers.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    for slot in range(args.workers):
+        spawn(slot)
+
+    while not shutting_down:
+        time.sleep(WORKER_RESTART_DELAY_SECONDS)
+        for slot, process in list(workers.items()):
+            if not process.is_alive() and not shutting_down:
+                logger.warning(f"Worker {process.pid} exited with code {process.exitcode}, restarting.")
+                spawn(slot)
+
+    deadline = time.monotonic() + args.graceful_timeout + 5
+    for process in workers.values():
+        process.join(timeout=max(0, deadline - time.monotonic()))
+        if process.is_alive():
+            logger.warning(f"Worker {process.pid} did not drain in time, killing it.")
+            process.kill()
+            process.join()
+    if shared_socket is not None:
+        shared_socket.close()
+    if shared_session_table is not None:
+        shared_session_table.close()
+        shared_session_table.unlink()
+    logger.info("All workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Offline resharding of a JsonFileDB data directory.
+
+    python -m tools.reshard_db --shards N [--data-dir data]
+
+Stop the backend first. All collections are rewritten with N shards into a new directory, which then
+replaces the data directory; the previous directory is kept next to it as `<data-dir>.pre-reshard`.
+Afterwards start the backend with DB_SHARD_COUNT=N.
+"""
+import argparse
+import os
+import shutil
+import sys
+from typing import Dict, List
+
+from core.adapters.db import record_file
+
+
+def _current_shard_count(data_dir: str) -> int:
+    shard_count = record_file.read_shard_count(data_dir)
+    if shard_count is not None:
+        return shard_count
+    collection_files = record_file.list_collection_files(data_dir)
+    if any(None in shards for shards in collection_files.values()):
+        return 1
+    return max((shard + 1 for shards in collection_files.values() for shard in shards), default=1)
+
+
+def _write_shard(file_path: str, records: List[dict]) -> None:
+    signature, offsets = record_file.write_collection_file(file_path, records)
+    record_file.write_offset_index(file_path, signature, offsets)
+
+
+def reshard(data_dir: str, shard_count: int) -> None:
+    current_shard_count = _current_shard_count(data_dir)
+    if current_shard_count == shard_count:
+        print(f"{data_dir} already has {shard_count} shards.")
+        return
+
+    new_dir = data_dir.rstrip(os.sep) + ".reshard-tmp"
+    backup_dir = data_dir.rstrip(os.sep) + ".pre-reshard"
+    if os.path.exists(new_dir) or os.path.exists(backup_dir):
+        sys.exit(f"Remove {new_dir} and {backup_dir} before resharding.")
+    os.makedirs(new_dir)
+
+    collection_files = record_file.list_collection_files(data_dir)
+    for collection in sorted(collection_files):
+        # Records are kept in their existing order within each new shard
+        shards: Dict[int, List[dict]] = {shard: [] for shard in range(shard_count)}
+        total = 0
+        for old_shard in sorted(collection_files[collection], key=lambda shard: -1 if shard is None else shard):
+            old_path = (os.path.join(data_dir, f"{collection}.json") if old_shard is None
+                        else os.path.join(data_dir, f"{collection}.{old_shard}.json"))
+            for record in record_file.iter_records(old_path):
+                shards[record_file.shard_for_id(record.get("id"), shard_count)].append(record)
+                total += 1
+        for shard, records in shards.items():
+            _write_shard(record_file.collection_file_path(new_dir, collection, shard, shard_count), records)
+        print(f"{collection}: {total} records -> {shard_count} shards")
+
+    # Carry over anything that is not a collection file, offset index, lock file, leftover temporary file
+    # or shard metadata
+    for name in os.listdir(data_dir):
+        path = os.path.join(data_dir, name)
+        if (record_file.COLLECTION_FILE_PATTERN.match(name)
+                or name.endswith((record_file.OFFSET_INDEX_SUFFIX, record_file.LOCK_FILE_SUFFIX, record_file.TEMP_FILE_SUFFIX))
+                or not os.path.isfile(path)):
+            continue
+        shutil.copy2(path, os.path.join(new_dir, name))
+    record_file.write_shard_count(new_dir, shard_count)
+
+    os.rename(data_dir, backup_dir)
+    os.rename(new_dir, data_dir)
+    print(f"Resharded {data_dir} from {current_shard_count} to {shard_count} shards. Previous data kept in {backup_dir}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Change the number of shards of a JsonFileDB data directory.")
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    reshard(args.data_dir, args.shards)
+
+
+if __name__ == "__main__":
+    main()
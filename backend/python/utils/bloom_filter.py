@@ -0,0 +1,76 @@
+import hashlib
+import math
+import sys
+from typing import Iterable, List, Optional
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+class CountingBloomFilter:
+    """
+    Counting Bloom filter: a Bloom filter with a small counter per slot instead of a bit, so items can be removed.
+
+    `might_contain` never returns False for an item that was added (and not removed), and returns
+    True for an absent item with probability close to `false_positive_rate` while at most `capacity`
+    items are stored. Counters saturate at 255 and are never decremented past that point.
+
+    `version` is free for the owner to record which version of the source data the filter reflects.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._counters = bytearray(self.size)
+        self.count = 0
+        self.version: Optional[object] = None
+        logger.info(f"CountingBloomFilter created with size: {self.size}, hash_count: {self.hash_count}.")
+
+    def _slots(self, item: str) -> List[int]:
+        # Double hashing (Kirsch-Mitzenmacher): k slots derived from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        """Add an item."""
+        for slot in self._slots(item):
+            if self._counters[slot] < 255:
+                self._counters[slot] += 1
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        """Add several items."""
+        for item in items:
+            self.add(item)
+
+    def rebuild(self, items: Iterable[str], version: Optional[object] = None) -> None:
+        """
+        Replace the contents with the given items, keeping the size. The new counters are filled on the
+        side and swapped in at the end, so this can run in a worker thread while lookups continue.
+        """
+        counters = bytearray(self.size)
+        count = 0
+        for item in items:
+            for slot in self._slots(item):
+                if counters[slot] < 255:
+                    counters[slot] += 1
+            count += 1
+        self._counters, self.count, self.version = counters, count, version
+
+    def remove(self, item: str) -> None:
+        """Remove an item. Only call this for items that were previously added."""
+        for slot in self._slots(item):
+            if 0 < self._counters[slot] < 255:
+                self._counters[slot] -= 1
+        self.count = max(0, self.count - 1)
+
+    def might_contain(self, item: str) -> bool:
+        """Return False if the item is definitely absent, True if it may be present."""
+        return all(self._counters[slot] for slot in self._slots(item))
+
+    def memory_usage(self) -> dict:
+        """Number of items, capacity and size of the counters."""
+        return {"items": self.count, "capacity": self.capacity, "bytes": sys.getsizeof(self._counters)}
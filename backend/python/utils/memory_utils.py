@@ -0,0 +1,77 @@
+import itertools
+import os
+import sys
+from typing import Collection, Dict, Iterable, Optional, Set
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+# Items measured to estimate the size of a large container; the rest are assumed to be alike
+SAMPLE_SIZE = 1000
+
+
+def deep_sizeof(obj, seen: Optional[Set[int]] = None) -> int:
+    """
+    Bytes used by an object and everything it references (containers, __dict__ and __slots__).
+
+    Objects already in `seen` are not counted again, so shared objects such as interned strings
+    count once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+        return size
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+        return size
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def _sampled_bytes(items: Iterable, count: int, sample_size: int) -> int:
+    seen: Set[int] = set()
+    sample = list(itertools.islice(items, sample_size))
+    if not sample:
+        return 0
+    sampled = sum(deep_sizeof(item, seen) for item in sample)
+    return round(sampled / len(sample) * count)
+
+
+def estimate_dict_bytes(data: dict, sample_size: int = SAMPLE_SIZE) -> int:
+    """Estimated deep size of a dict, measuring up to sample_size entries and extrapolating to the rest."""
+    return sys.getsizeof(data) + _sampled_bytes(data.items(), len(data), sample_size)
+
+
+def estimate_list_bytes(data: Collection, sample_size: int = SAMPLE_SIZE) -> int:
+    """Estimated deep size of a list (or deque, set...), measuring up to sample_size items and extrapolating to the rest."""
+    return sys.getsizeof(data) + _sampled_bytes(iter(data), len(data), sample_size)
+
+
+def process_memory() -> Dict[str, int]:
+    """Resident set size of the process now (Linux only) and at its peak, in bytes."""
+    usage = {}
+    try:
+        with open("/proc/self/statm") as f:
+            usage["rss_bytes"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        usage["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return usage
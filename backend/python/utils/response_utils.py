@@ -0,0 +1,18 @@
+from fastapi import Response
+from pydantic_core import to_json
+from core.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+def trusted_json_response(content: dict, status_code: int) -> Response:
+    """
+    Serialize a response body to JSON bytes, skipping Pydantic model construction and FastAPI's
+    response_model validation.
+
+    Meant for bodies built from data read through the DAO layer, which was validated when it was
+    written. The caller shapes `content` like the endpoint's declared response_model; it is encoded
+    once by pydantic-core instead of being validated into models, dumped, validated against the
+    response_model and encoded again.
+    """
+    logger.debug(f"Serializing trusted response with status code: {status_code}")
+    return Response(content=to_json(content), media_type="application/json", status_code=status_code)
@@ -4,6 +4,8 @@ from core.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+_dummy_password_hash = None
+
 def is_valid_username(username: str) -> bool:
     """Validate the username based on length constraints."""
     logger.debug(f"Validating username: {username}")
@@ -63,4 +65,12 @@ def verify_password(password: str, hashed_password: str) -> bool:
             return False
     except Exception as e:
         logger.error(f"Error verifying password. Error: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def verify_dummy_password(password: str) -> bool:
+    """Run a bcrypt verification against a fixed hash, so unknown usernames cost the same time as known ones."""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = get_hashed_password("dummy-password")
+    verify_password(password, _dummy_password_hash)
+    return False
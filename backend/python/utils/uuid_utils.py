@@ -1,11 +1,85 @@
+import os
+import threading
+import time
+from typing import Callable, Dict
 from uuid import uuid4
+from config.constants import RECORD_ID_GENERATOR
 from core.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+CROCKFORD_BASE32_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_lock = threading.Lock()
+_last_timestamp_ms = -1
+_last_random = 0
+
+
+def _next_timestamp_and_random(random_bits: int):
+    """
+    Return (unix time in ms, random bits) for a time-ordered ID.
+
+    Within the same millisecond the random part is incremented instead of redrawn, so IDs generated
+    by this process are strictly increasing (monotonic UUIDv7 / ULID generation).
+    """
+    global _last_timestamp_ms, _last_random
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms <= _last_timestamp_ms:
+            timestamp_ms = _last_timestamp_ms
+            random = _last_random + 1
+            if random >> random_bits:
+                # Random part overflowed within one millisecond: borrow the next millisecond
+                timestamp_ms += 1
+                random = int.from_bytes(os.urandom(10), "big") >> (80 - random_bits + 1)
+        else:
+            # Leave the top random bit clear so there is room to increment within the millisecond
+            random = int.from_bytes(os.urandom(10), "big") >> (80 - random_bits + 1)
+        _last_timestamp_ms, _last_random = timestamp_ms, random
+        return timestamp_ms, random
+
+
+def generate_uuid4() -> str:
+    """Random UUID (version 4) as a hex string."""
+    return uuid4().hex
+
+
+def generate_uuid7() -> str:
+    """Time-ordered UUID (version 7, RFC 9562) as a hex string: 48-bit ms timestamp followed by random bits."""
+    timestamp_ms, random = _next_timestamp_and_random(74)
+    rand_a, rand_b = random >> 62, random & ((1 << 62) - 1)
+    value = (timestamp_ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b
+    return f"{value:032x}"
+
+
+def generate_ulid() -> str:
+    """Time-ordered ULID: 48-bit ms timestamp and 80 random bits, as 26 Crockford base32 characters."""
+    timestamp_ms, random = _next_timestamp_and_random(80)
+    value = (timestamp_ms << 80) | random
+    return "".join(CROCKFORD_BASE32_ALPHABET[(value >> shift) & 0x1F] for shift in range(125, -1, -5))
+
+
+ID_GENERATORS: Dict[str, Callable[[], str]] = {
+    "uuid4": generate_uuid4,
+    "uuid7": generate_uuid7,
+    "ulid": generate_ulid,
+}
+
+
 def generate_uuid() -> str:
-    """Generate a new UUID and return it as a hex string."""
-    logger.debug("Generating a new UUID.")
-    new_uuid = uuid4().hex
+    """Generate a new record ID with the configured generator (RECORD_ID_GENERATOR)."""
+    logger.debug(f"Generating a new record ID with generator: {RECORD_ID_GENERATOR}")
+    generator = ID_GENERATORS.get(RECORD_ID_GENERATOR)
+    if generator is None:
+        logger.error(f"Unsupported RECORD_ID_GENERATOR: {RECORD_ID_GENERATOR}")
+        raise ValueError(f"Unsupported RECORD_ID_GENERATOR: {RECORD_ID_GENERATOR}")
+    new_uuid = generator()
     logger.info(f"Generated UUID: {new_uuid}")
-    return new_uuid
\ No newline at end of file
+    return new_uuid
+
+
+def generate_session_id() -> str:
+    """Generate a new session ID. Always fully random so session IDs cannot be guessed from creation time."""
+    logger.debug("Generating a new session ID.")
+    return uuid4().hex
+
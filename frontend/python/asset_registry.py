@@ -0,0 +1,219 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip variants are precomputed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_CONTENT_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 256
+STATIC_URL_PREFIX = "/ui/static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ASSET_REFERENCE_PATTERN = re.compile(r'(\b(?:src|href)=")([^"]+)(")')
+
+
+class Asset:
+    """A file held in memory with its validators and precompressed variants."""
+
+    def __init__(self, file_path: str, content: bytes, mtime: float, cache_control: str = "no-cache"):
+        self.file_path = file_path
+        self.content = content
+        self.mtime = mtime
+        self.cache_control = cache_control
+        self.content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        if self.content_type.startswith("text/"):
+            self.content_type += "; charset=utf-8"
+        self.etag = hashlib.sha256(content).hexdigest()[:16]
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.variants: Dict[str, bytes] = {}
+        if len(content) >= MIN_COMPRESS_SIZE and self.content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            self._add_variant("gzip", gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._add_variant("br", brotli.compress(content, quality=11))
+
+    def _add_variant(self, encoding: str, compressed: bytes) -> None:
+        # Only keep a variant if it is actually smaller than the original
+        if len(compressed) < len(self.content):
+            self.variants[encoding] = compressed
+
+
+class AssetRegistry:
+    """
+    In-memory registry of the UI pages and static files, keyed by URL path.
+
+    Files are read once (on `load`) instead of per request. Responses are negotiated against
+    `Accept-Encoding` and honour `If-None-Match` / `If-Modified-Since` with 304s.
+
+    Static files are also registered under a fingerprinted path containing their content hash
+    (e.g. /ui/static/login.3f2a9c1e.js) that is served as immutable, and references to static
+    files in the HTML pages are rewritten to the fingerprinted paths.
+    """
+
+    def __init__(self, base_dir: str = "."):
+        self.base_dir = base_dir
+        self._assets: Dict[str, Asset] = {}
+        self._mtimes: Dict[str, float] = {}
+        self.fingerprinted_paths: Dict[str, str] = {}
+
+    def _discover_files(self) -> Dict[str, str]:
+        """Map URL paths to file paths for index.html, ui/*.html and everything under ui/static/."""
+        files = {"/": os.path.join(self.base_dir, "index.html")}
+        ui_dir = os.path.join(self.base_dir, "ui")
+        if os.path.isdir(ui_dir):
+            for name in os.listdir(ui_dir):
+                if name.endswith(".html"):
+                    files[f"/ui/{name[:-len('.html')]}"] = os.path.join(ui_dir, name)
+        static_dir = os.path.join(ui_dir, "static")
+        for root, _, names in os.walk(static_dir):
+            for name in names:
+                file_path = os.path.join(root, name)
+                relative_path = os.path.relpath(file_path, static_dir).replace(os.sep, "/")
+                files[f"/ui/static/{relative_path}"] = file_path
+        return {url_path: file_path for url_path, file_path in files.items() if os.path.isfile(file_path)}
+
+    def _load_asset(self, file_path: str) -> Asset:
+        with open(file_path, "rb") as f:
+            content = f.read()
+        return Asset(file_path, content, os.path.getmtime(file_path))
+
+    @staticmethod
+    def _fingerprint_path(url_path: str, asset: Asset) -> str:
+        directory, name = posixpath.split(url_path)
+        stem, ext = posixpath.splitext(name)
+        return f"{directory}/{stem}.{asset.etag[:8]}{ext}"
+
+    def _rewrite_references(self, page_url_path: str, asset: Asset) -> Asset:
+        """Point src/href references to static files at their fingerprinted paths."""
+        html = asset.content.decode("utf-8")
+
+        def replace(match):
+            reference = match.group(2)
+            resolved = posixpath.normpath(posixpath.join(posixpath.dirname(page_url_path), reference))
+            fingerprinted = self.fingerprinted_paths.get(resolved)
+            if fingerprinted is None:
+                return match.group(0)
+            # Keep the reference in its original (possibly relative) form, swapping only the file name
+            prefix = reference.rsplit("/", 1)[0] + "/" if "/" in reference else ""
+            return f"{match.group(1)}{prefix}{posixpath.basename(fingerprinted)}{match.group(3)}"
+
+        rewritten = ASSET_REFERENCE_PATTERN.sub(replace, html)
+        if rewritten == html:
+            return asset
+        return Asset(asset.file_path, rewritten.encode("utf-8"), asset.mtime)
+
+    def load(self) -> None:
+        """(Re)load every asset into memory, fingerprint static files and rewrite page references."""
+        files = self._discover_files()
+        assets = {url_path: self._load_asset(file_path) for url_path, file_path in files.items()}
+
+        fingerprinted_paths = {}
+        for url_path, asset in list(assets.items()):
+            if url_path.startswith(STATIC_URL_PREFIX):
+                fingerprinted_path = self._fingerprint_path(url_path, asset)
+                fingerprinted_paths[url_path] = fingerprinted_path
+                assets[fingerprinted_path] = Asset(asset.file_path, asset.content, asset.mtime,
+                                                   cache_control=IMMUTABLE_CACHE_CONTROL)
+        self.fingerprinted_paths = fingerprinted_paths
+
+        for url_path, asset in list(assets.items()):
+            if asset.content_type.startswith("text/html"):
+                # Page URLs have no trailing slash, so "/" and "/ui/resource" resolve relative references correctly
+                assets[url_path] = self._rewrite_references(url_path, asset)
+
+        self._assets = assets
+        self._mtimes = {url_path: assets[url_path].mtime for url_path in files}
+        logger.info(f"Loaded {len(files)} assets ({len(fingerprinted_paths)} fingerprinted) into memory.")
+
+    def reload_changed(self) -> List[str]:
+        """Reload assets whose files were added, removed or modified. Returns the changed URL paths."""
+        files = self._discover_files()
+        changed = [url_path for url_path in self._mtimes if url_path not in files]
+        for url_path, file_path in files.items():
+            if self._mtimes.get(url_path) != os.path.getmtime(file_path):
+                changed.append(url_path)
+        if changed:
+            self.load()
+        return changed
+
+    async def watch(self, interval_seconds: float = 1.0) -> None:
+        """Poll the asset files for changes and reload them (dev mode)."""
+        logger.info(f"Watching UI assets for changes every {interval_seconds} seconds.")
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                changed = self.reload_changed()
+                if changed:
+                    logger.info(f"Reloaded changed UI assets: {changed}")
+            except Exception as e:
+                logger.error(f"Error while reloading UI assets. Error: {e}")
+
+    def get(self, url_path: str) -> Optional[Asset]:
+        """Get the asset served at a URL path."""
+        return self._assets.get(url_path)
+
+    @staticmethod
+    def _negotiate_encoding(asset: Asset, accept_encoding: str) -> Optional[str]:
+        accepted = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            if name:
+                accepted[name.strip().lower()] = quality
+        for encoding in ("br", "gzip"):
+            if encoding in asset.variants and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    @staticmethod
+    def _is_not_modified(asset: Asset, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            for tag in if_none_match.split(","):
+                tag = tag.strip()
+                if tag == "*":
+                    return True
+                tag = tag[2:] if tag.startswith("W/") else tag
+                if tag.strip('"').split("-")[0] == asset.etag:
+                    return True
+            return False
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                return int(asset.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def build_response(self, asset: Asset, request: Request) -> Response:
+        """Build the response for an asset, negotiating the encoding and answering conditional requests."""
+        encoding = self._negotiate_encoding(asset, request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"',
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if self._is_not_modified(asset, request):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(content=asset.variants[encoding], media_type=asset.content_type, headers=headers)
+        return Response(content=asset.content, media_type=asset.content_type, headers=headers)
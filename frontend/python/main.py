@@ -1,7 +1,11 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from aiofile import AIOFile
+from starlette.background import BackgroundTask
+from asset_registry import AssetRegistry
+from request_coalescer import RequestCoalescer, UpstreamResult
+from typing import Optional
+import asyncio
 import os
 import logging
 import aiohttp
@@ -16,6 +20,31 @@ formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(messag
 ch.setFormatter(formatter)
 logger.addHandler(ch)
 
+# Backend API client configuration
+BACKEND_API_BASE_URL = os.getenv("BACKEND_API_BASE_URL", "http://localhost:8000/api/v1")
+BACKEND_CLIENT_POOL_SIZE = int(os.getenv("BACKEND_CLIENT_POOL_SIZE", "100"))
+BACKEND_CLIENT_KEEPALIVE_SECONDS = float(os.getenv("BACKEND_CLIENT_KEEPALIVE_SECONDS", "30"))
+BACKEND_CLIENT_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BACKEND_CLIENT_CONNECT_TIMEOUT_SECONDS", "2"))
+BACKEND_CLIENT_TOTAL_TIMEOUT_SECONDS = float(os.getenv("BACKEND_CLIENT_TOTAL_TIMEOUT_SECONDS", "10"))
+STREAM_CHUNK_SIZE = 64 * 1024
+# Request headers forwarded to the backend; Host, Content-Length, Accept-Encoding etc. are set by the client session
+FORWARDED_REQUEST_HEADERS = ("accept", "accept-language", "authorization", "cookie")
+
+# Long-lived client session shared by all proxied requests (created on startup)
+backend_client_session: Optional[aiohttp.ClientSession] = None
+
+# Identical concurrent proxied requests (same upstream URL and forwarded headers) share one backend call
+PROXY_COALESCING_ENABLED = os.getenv("PROXY_COALESCING_ENABLED", "true").lower() == "true"
+PROXY_MICRO_CACHE_SECONDS = float(os.getenv("PROXY_MICRO_CACHE_SECONDS", "0.25"))
+# The frontend has no authentication of its own, so the coalescing stats are off unless asked for
+PROXY_STATS_ENABLED = os.getenv("PROXY_STATS_ENABLED", "false").lower() == "true"
+request_coalescer = RequestCoalescer(micro_cache_seconds=PROXY_MICRO_CACHE_SECONDS)
+
+# UI pages and static files, held in memory with precompressed variants (loaded on startup)
+FRONTEND_DEV_MODE = os.getenv("FRONTEND_DEV_MODE", "false").lower() == "true"
+asset_registry = AssetRegistry(base_dir=".")
+asset_watch_task: Optional[asyncio.Task] = None
+
 # Initialize FastAPI app
 logger.info("Initializing FastAPI application.")
 app = FastAPI()
@@ -30,89 +59,155 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-async def get_file_content(file_path: str) -> str:
-    """Read the content of a file asynchronously."""
-    logger.debug(f"Attempting to read file: {file_path}")
-    try:
-        async with AIOFile(file_path, 'r') as afp:
-            content = await afp.read()
-        logger.debug(f"Successfully read file: {file_path}")
-        return content
-    except Exception as e:
-        logger.error(f"Error reading file: {file_path}. Error: {e}")
-        return f"<h1>Error loading file: {str(e)}</h1>"
-
 @app.get("/")
-async def serve_index_html_page():
+async def serve_index_html_page(request: Request):
     """Serve the index.html page."""
     logger.info("Serving the index.html page.")
     try:
-        index_html_file_path = "index.html"
-        if os.path.exists(index_html_file_path):
-            logger.debug(f"index.html file found at: {index_html_file_path}")
-            content = await get_file_content(index_html_file_path)
-            return HTMLResponse(content=content)
+        asset = asset_registry.get("/")
+        if asset is not None:
+            logger.debug(f"index.html served from memory: {asset.file_path}")
+            return asset_registry.build_response(asset, request)
         else:
-            logger.warning(f"index.html file not found at: {index_html_file_path}")
+            logger.warning("index.html file not found.")
             return HTMLResponse(content="<h1>404 Not Found</h1>", status_code=404)
     except Exception as e:
         logger.error(f"Error serving index.html page. Error: {e}")
         return HTMLResponse(content=f"<h1>Error loading page: {str(e)}</h1>", status_code=500)
 
 @app.get("/ui/{page}")
-async def serve_ui_page(page: str):
+async def serve_ui_page(page: str, request: Request):
     """Serve a UI page."""
     logger.info(f"Serving UI page: {page}")
     try:
-        ui_page_html_file_path = f"ui/{page}.html"
-        if os.path.exists(ui_page_html_file_path):
-            logger.debug(f"UI page file found at: {ui_page_html_file_path}")
-            content = await get_file_content(ui_page_html_file_path)
-            return HTMLResponse(content=content)
+        asset = asset_registry.get(f"/ui/{page}")
+        if asset is not None:
+            logger.debug(f"UI page served from memory: {asset.file_path}")
+            return asset_registry.build_response(asset, request)
         else:
-            logger.warning(f"UI page file not found at: {ui_page_html_file_path}")
+            logger.warning(f"UI page file not found for page: {page}")
             return HTMLResponse(content="<h1>404 Not Found</h1>", status_code=404)
     except Exception as e:
         logger.error(f"Error serving UI page: {page}. Error: {e}")
         return HTMLResponse(content=f"<h1>Error loading page: {str(e)}</h1>", status_code=500)
 
 @app.get("/ui/static/{file_path:path}")
-async def serve_static_file(file_path: str):
+async def serve_static_file(file_path: str, request: Request):
     """Serve a static file."""
     logger.info(f"Serving static file: {file_path}")
     try:
-        static_file_full_path = f"ui/static/{file_path}"
-        if os.path.exists(static_file_full_path):
-            logger.debug(f"Static file found at: {static_file_full_path}")
-            return FileResponse(static_file_full_path)
+        asset = asset_registry.get(f"/ui/static/{file_path}")
+        if asset is not None:
+            logger.debug(f"Static file served from memory: {asset.file_path}")
+            return asset_registry.build_response(asset, request)
         else:
-            logger.warning(f"Static file not found at: {static_file_full_path}")
+            logger.warning(f"Static file not found: {file_path}")
             return HTMLResponse(content="<h1>404 Not Found</h1>", status_code=404)
     except Exception as e:
         logger.error(f"Error serving static file: {file_path}. Error: {e}")
         return HTMLResponse(content=f"<h1>Error loading file: {str(e)}</h1>", status_code=500)
     
+async def startup_event_handler():
+    """Load the UI assets and create the pooled client session used to proxy requests to the backend."""
+    global backend_client_session, asset_watch_task
+    logger.info("Loading UI assets into memory.")
+    asset_registry.load()
+    if FRONTEND_DEV_MODE:
+        asset_watch_task = asyncio.create_task(asset_registry.watch())
+
+    logger.info("Creating backend client session.")
+    connector = aiohttp.TCPConnector(
+        limit=BACKEND_CLIENT_POOL_SIZE,
+        limit_per_host=BACKEND_CLIENT_POOL_SIZE,
+        keepalive_timeout=BACKEND_CLIENT_KEEPALIVE_SECONDS,
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(total=BACKEND_CLIENT_TOTAL_TIMEOUT_SECONDS, connect=BACKEND_CLIENT_CONNECT_TIMEOUT_SECONDS)
+    backend_client_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+async def shutdown_event_handler():
+    """Stop watching UI assets and close the backend client session and its pooled connections."""
+    global backend_client_session, asset_watch_task
+    if asset_watch_task is not None:
+        asset_watch_task.cancel()
+        asset_watch_task = None
+    logger.info("Closing backend client session.")
+    if backend_client_session is not None:
+        await backend_client_session.close()
+        backend_client_session = None
+
+app.add_event_handler("startup", startup_event_handler)
+app.add_event_handler("shutdown", shutdown_event_handler)
+
+async def stream_upstream_body(upstream_response: aiohttp.ClientResponse):
+    """
+    Yield the upstream response body in chunks and release the connection back to the pool when done.
+    The response is also released by a background task of the StreamingResponse, for clients that
+    disconnect before the body is iterated (the generator's finally never runs then).
+    """
+    try:
+        async for chunk in upstream_response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        upstream_response.release()
+
+def upstream_headers(request: Request) -> dict:
+    """The allow-listed headers of an incoming request, to forward to the backend."""
+    return {name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers}
+
+async def fetch_upstream(url: str, headers) -> UpstreamResult:
+    """Fetch an upstream URL and return its status, content type and raw body bytes."""
+    async with backend_client_session.get(url=url, headers=headers) as response:
+        body = await response.read()
+        return response.status, response.headers.get("Content-Type", "application/json"), body
+
 @app.get("/ui/protected/resources")
 async def get_all_protected_resources(request: Request):
     logger.info("Request received: GET /ui/protected/resources")
     
-    url = "http://localhost:8000/api/v1/resources"
+    url = f"{BACKEND_API_BASE_URL}/resources"
     logger.info(f"Fetching protected resources from URL: {url}")
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url=url, headers=request.headers) as response:
-                logger.info(f"Received response with status: {response.status}")
-                
-                if response.status == 200:
-                    data = await response.json()
-                    logger.info(f"Successfully retrieved {data}")
-                    return data
-                else:
-                    # Log detailed info for non-200 responses
-                    text = await response.text()
-                    logger.warning(f"Failed to retrieve resources. Status: {response.status}, Response: {text}")
-                    return JSONResponse(status_code=response.status, content={"error": "Failed to fetch resources"})
+        if PROXY_COALESCING_ENABLED:
+            # The upstream call is made with the first caller's headers, so only callers with the same
+            # forwarded headers (cookies, authorization) may share it
+            headers = upstream_headers(request)
+            key = (url, tuple(sorted(headers.items())))
+            status, content_type, body = await request_coalescer.get(key, lambda: fetch_upstream(url, headers))
+            logger.info(f"Received response with status: {status}")
+            if status == 200:
+                return Response(content=body, status_code=200, media_type=content_type)
+            logger.warning(f"Failed to retrieve resources. Status: {status}, Response: {body[:500]!r}")
+            return JSONResponse(status_code=status, content={"error": "Failed to fetch resources"})
+
+        response = await backend_client_session.get(url=url, headers=upstream_headers(request))
+        streaming = False
+        try:
+            logger.info(f"Received response with status: {response.status}")
+
+            if response.status == 200:
+                logger.info("Streaming protected resources to the client.")
+                streaming = True
+                # release() is idempotent, so the generator and the background task may both call it
+                return StreamingResponse(stream_upstream_body(response), status_code=200,
+                                         media_type=response.headers.get("Content-Type", "application/json"),
+                                         background=BackgroundTask(response.release))
+            else:
+                # Log detailed info for non-200 responses
+                text = await response.text()
+                logger.warning(f"Failed to retrieve resources. Status: {response.status}, Response: {text}")
+                return JSONResponse(status_code=response.status, content={"error": "Failed to fetch resources"})
+        finally:
+            if not streaming:
+                response.release()
     except Exception as e:
         logger.error(f"Exception occurred while retrieving resources: {e}")
-        return JSONResponse(status_code=500, content={"error": "Internal Server Error"})
\ No newline at end of file
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error"})
+
+@app.get("/proxy/stats")
+async def get_proxy_stats():
+    """Report how many proxied requests went upstream versus were coalesced or served from the micro-cache."""
+    if not PROXY_STATS_ENABLED:
+        return JSONResponse(status_code=404, content={"error": "Not Found"})
+    return request_coalescer.get_stats()
\ No newline at end of file
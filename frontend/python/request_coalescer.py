@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (status, content type, body) of an upstream response
+UpstreamResult = Tuple[int, str, bytes]
+
+
+class RequestCoalescer:
+    """
+    Single-flight coalescing of identical upstream calls, with an optional short micro-cache.
+
+    Concurrent callers with the same key share one in-flight upstream call. Successful (200)
+    results are additionally reused for `micro_cache_seconds` after they complete (0 disables this).
+    """
+
+    def __init__(self, micro_cache_seconds: float = 0.0, max_cache_entries: int = 1000):
+        self.micro_cache_seconds = micro_cache_seconds
+        self.max_cache_entries = max_cache_entries
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._cache: Dict[Hashable, Tuple[UpstreamResult, float]] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self.cache_hits = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._in_flight),
+        }
+
+    def _get_cached(self, key: Hashable):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return None
+        return result
+
+    def _store(self, key: Hashable, result: UpstreamResult) -> None:
+        if self.micro_cache_seconds <= 0 or result[0] != 200:
+            return
+        if len(self._cache) >= self.max_cache_entries:
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[1] > now}
+            if len(self._cache) >= self.max_cache_entries:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (result, time.monotonic() + self.micro_cache_seconds)
+
+    async def _run(self, key: Hashable, fetch: Callable[[], Awaitable[UpstreamResult]]) -> UpstreamResult:
+        try:
+            result = await fetch()
+            self._store(key, result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[UpstreamResult]]) -> UpstreamResult:
+        """Return the result for `key`, from the micro-cache, an in-flight call, or a new upstream call."""
+        cached = self._get_cached(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+            logger.debug(f"Coalescing request onto in-flight upstream call for key: {key}")
+        else:
+            self.upstream_calls += 1
+            task = asyncio.create_task(self._run(key, fetch))
+            self._in_flight[key] = task
+        # Shield the shared call so one caller disconnecting does not cancel it for the others
+        return await asyncio.shield(task)